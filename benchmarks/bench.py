@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+
+SCENARIOS = ('cold_build', 'warm_build', 'change_rebuild', 'serve_latency')
+
+WORDS = """
+lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor
+incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud
+exercitation ullamco laboris nisi aliquip ex ea commodo consequat duis aute
+""".split()
+
+PROJECT = """
+#!/usr/bin/env python3
+import os
+from noise import Noise
+
+app = Noise(__file__)
+CONTENT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content')
+
+def post(page):
+    name = page.route.split('/')[2]
+    page.template = app.path.template('post.html')
+    page.data['title'] = name
+    page.data['post'] = os.path.join(CONTENT, name + '.md')
+
+for name in sorted(os.listdir(CONTENT)):
+    app.route('/posts/{}/'.format(name[:-3]))(post)
+""".lstrip()
+
+
+def paragraph(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def markdown(rng, size):
+    parts = ['# ' + paragraph(rng, 4)]
+    while sum(map(len, parts)) < size:
+        kind = rng.random()
+        if kind < 0.15:
+            parts.append('## ' + paragraph(rng, 3))
+        elif kind < 0.3:
+            parts.append('\n'.join('- ' + paragraph(rng, 6) for _ in range(4)))
+        elif kind < 0.4:
+            parts.append('```python\nprint({!r})\n```'.format(paragraph(rng, 5)))
+        else:
+            parts.append(paragraph(rng, 60))
+    return '\n\n'.join(parts) + '\n'
+
+def generate(path, routes=100, depth=3, markdown_size=4096, static_files=50,
+             static_size=16384, seed=0):
+    rng = random.Random(seed)
+    for d in ('content', 'template', 'static/css', 'static/img'):
+        os.makedirs(os.path.join(path, d), exist_ok=True)
+    with open(os.path.join(path, '__init__.py'), 'w') as f:
+        f.write(PROJECT)
+
+    for i in range(depth):
+        with open(os.path.join(path, 'template', 'base{}.html'.format(i)), 'w') as f:
+            if i == 0:
+                f.write('<!DOCTYPE html>\n<html>\n  <head><title>{{ title }}</title></head>\n'
+                        '  <body>\n    {% block content %}{% block main %}{% endblock %}{% endblock %}\n'
+                        '  </body>\n</html>\n')
+            else:
+                f.write("{{% extends 'base{}.html' %}}\n{{% block content %}}\n"
+                        "    <div class=\"level{}\">{{{{ super() }}}}</div>\n"
+                        "{{% endblock %}}\n".format(i - 1, i))
+    with open(os.path.join(path, 'template', 'post.html'), 'w') as f:
+        f.write("{{% extends 'base{}.html' %}}\n{{% block main %}}\n"
+                "    <article>{{{{ post|markdown }}}}</article>\n"
+                "{{% endblock %}}\n".format(max(depth - 1, 0)) if depth else
+                "<article>{{ post|markdown }}</article>\n")
+
+    for i in range(routes):
+        with open(os.path.join(path, 'content', 'post{:06d}.md'.format(i)), 'w') as f:
+            f.write(markdown(rng, markdown_size))
+
+    for i in range(static_files):
+        if i % 2:
+            name = os.path.join('static', 'img', 'image{:05d}.bin'.format(i))
+            data = rng.getrandbits(8 * static_size).to_bytes(static_size, 'little')
+        else:
+            name = os.path.join('static', 'css', 'style{:05d}.css'.format(i))
+            data = ('.c{} {{ color: #{:06x}; }}\n'.format(i, rng.getrandbits(24)) *
+                    (static_size // 24 + 1))[:static_size].encode()
+        with open(os.path.join(path, name), 'wb') as f:
+            f.write(data)
+    return path
+
+
+def load(path):
+    sys.path.insert(0, SRC)
+    from noise import load_project
+    return load_project(path).app
+
+def scenario(name, path, jobs=1):
+    logging.getLogger("noise").setLevel(logging.WARNING)
+    app = load(path)
+    result = {}
+    if name == 'cold_build':
+        start = time.perf_counter()
+        app.build(jobs=jobs)
+        result['seconds'] = time.perf_counter() - start
+    elif name == 'warm_build':
+        app.build(jobs=jobs)
+        start = time.perf_counter()
+        app.build(jobs=jobs, incremental=True)
+        result['seconds'] = time.perf_counter() - start
+    elif name == 'change_rebuild':
+        app.build(jobs=jobs)
+        post = os.path.join(path, 'content', sorted(os.listdir(os.path.join(path, 'content')))[0])
+        with open(post, 'a') as f:
+            f.write('\nChanged.\n')
+        start = time.perf_counter()
+        app.update([post])
+        result['seconds'] = time.perf_counter() - start
+    elif name == 'serve_latency':
+        import http.client
+        import threading
+        from noise.server import DevServer, PageCache
+        server = DevServer(str(app.path.static), app.path, lambda changed: None,
+                           pages=PageCache(app, len(app.routes)))
+        httpd = server.bind('127.0.0.1', 0)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        conn = http.client.HTTPConnection('127.0.0.1', httpd.server_address[1])
+        latencies = []
+        routes = list(app.routes)[:50] * 4
+        for route in routes:
+            start = time.perf_counter()
+            conn.request('GET', route)
+            conn.getresponse().read()
+            latencies.append(time.perf_counter() - start)
+        httpd.shutdown()
+        latencies.sort()
+        result['seconds'] = sum(latencies) / len(latencies)
+        result['p95'] = latencies[int(len(latencies) * 0.95) - 1]
+    result['rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+def run(options):
+    results = {}
+    for name in options.scenarios:
+        best = None
+        for _ in range(options.repeat):
+            tmpdir = tempfile.mkdtemp(prefix='noise-bench-')
+            try:
+                generate(tmpdir, options.routes, options.depth, options.markdown_size,
+                         options.static_files, options.static_size, options.seed)
+                output = subprocess.check_output([
+                    sys.executable, os.path.abspath(__file__), '--scenario', name,
+                    '--jobs', str(options.jobs), tmpdir
+                ])
+            finally:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            if best is None or result['seconds'] < best['seconds']:
+                best = result
+        results[name] = best
+        print("{:16s} {:10.2f}ms {:10d} KiB".format(name, best['seconds'] * 1000, best['rss_kb']))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {key: getattr(options, key) for key in (
+                'routes', 'depth', 'markdown_size', 'static_files', 'static_size', 'seed', 'jobs')},
+        },
+        'results': results,
+    }
+
+def compare(baseline, current, threshold):
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        for metric in ('seconds', 'rss_kb'):
+            if metric in base and result[metric] > base[metric] * (1 + threshold):
+                regressions.append((name, metric, base[metric], result[metric]))
+    return regressions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="noise build benchmarks")
+    parser.add_argument('path', nargs='?', help=argparse.SUPPRESS)
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    parser.add_argument('--routes', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=3, help="template inheritance depth")
+    parser.add_argument('--markdown-size', type=int, default=4096, help="bytes per Markdown file")
+    parser.add_argument('--static-files', type=int, default=100)
+    parser.add_argument('--static-size', type=int, default=16384, help="bytes per static file")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per scenario, best is kept")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--compare', metavar='BASELINE', help="compare against a previous JSON result")
+    parser.add_argument('--threshold', type=float, default=0.1,
+        help="allowed slowdown before failing (default: 0.1 = 10%%)")
+    parser.add_argument('--generate', metavar='PATH', help="only generate a synthetic project")
+    options = parser.parse_args()
+
+    if options.scenario:
+        print(json.dumps(scenario(options.scenario, options.path, options.jobs)))
+        return
+    if options.generate:
+        generate(options.generate, options.routes, options.depth, options.markdown_size,
+                 options.static_files, options.static_size, options.seed)
+        return
+
+    current = run(options)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, options.threshold)
+        for name, metric, before, after in regressions:
+            print("regression: {} {} {:.4g} -> {:.4g}".format(name, metric, before, after))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,27 +6,91 @@ __copyright__ = "Copyright 2014-2026, Ryon Sherman"
 __license__   = "MIT"
 __version__   = "2.0.0"
 
-import importlib.util
 import logging
 import os
-import shutil
 import sys
 
-from noise.path import Path
+from noise.collection import Collection
+from noise.manifest import Manifest, hash_data
+from noise import output
+from noise.path import NoisePath, Path
+from noise.profile import Profiler, record, span
 from noise.page import Page
-from noise.route import Route
-from noise.template import Template
+from noise.route import Parameterized, Route
 
-logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger("noise")
 
 
 class Noise(object):
-    def __init__(self, path):
+    def __init__(self, path, cache=True):
         self.path = Path(path)
         self.route = Route(self)
         self.routes = {}
-        self.template = Template(self)
+        self.collections = {}
+        self.hooks = {'pre_render': [], 'post_render': []}
+        self.profiler = None
+        self.assets = None
+        self.minifier = None
+        self.render_cache = None
+        self.concurrency = None
+        self.cache = self.path.cache if cache else None
+        self._template = None
+
+    @property
+    def template(self):
+        if self._template is None:
+            from noise.template import Template
+            self._template = Template(self, self.cache)
+        return self._template
+
+    @template.setter
+    def template(self, template):
+        self._template = template
+
+    def pre_render(self, callback):
+        self.hooks['pre_render'].append(callback)
+        return callback
+
+    def post_render(self, callback):
+        self.hooks['post_render'].append(callback)
+        return callback
+
+    def collection(self, pattern):
+        if pattern not in self.collections:
+            self.collections[pattern] = Collection(self, pattern)
+        return self.collections[pattern]
+
+    def asset(self, name):
+        if self.assets is not None:
+            return self.assets.url(name)
+        return '/' + name.lstrip('/')
+
+    def reset(self, changed=None):
+        if changed is None:
+            if self._template is not None:
+                self._template.reset()
+            for collection in self.collections.values():
+                collection.reset()
+            return
+        if self._template is not None:
+            self._template.invalidate(changed)
+        for collection in self.collections.values():
+            if any(map(collection.matches, changed)):
+                collection.reset()
+
+    def adopt(self, other):
+        collections = {}
+        for pattern, collection in other.collections.items():
+            current = self.collections.get(pattern)
+            if current is not None and current._entries is not None:
+                collection._entries = current._entries
+            collection.app = self
+            collections[pattern] = collection
+        if other._template is not None:
+            self.template.adopt(other._template)
+        self.routes = other.routes
+        self.hooks = other.hooks
+        self.collections = collections
 
     def init(self):
         self.path.init()
@@ -37,43 +101,328 @@ class Noise(object):
                 f.write(BOILERPLATE)
         log.info("Initialized project at %s", self.path)
 
-    def build(self):
+    def compile(self):
+        names = self.template.compile()
+        for name in names:
+            log.debug("Compiled %s", name)
+        log.info("Compiled %d templates", len(names))
+
+    def build(self, incremental=False, jobs=1, compress=False, atomic=False,
+              hardlink=False, checksum=False, profile=False, fingerprint=False,
+              minify=False, shard=None, render_cache=None, render_cache_size=None,
+              concurrency=None):
+        from noise import static
+        from noise.compress import EXTENSIONS, compress_tree
+        original = self.path.build
+        index, count = shard or (0, 1)
+        manifest_path = self.path.cache('manifest.json')
+        if shard is not None:
+            from noise.shard import output_path
+            self.path.build = NoisePath(output_path(self, index))
+            manifest_path = self.path.cache('manifest.{}-of-{}.json'.format(index + 1, count))
         build_path = str(self.path.build)
-        if os.path.exists(build_path):
-            shutil.rmtree(build_path)
+        if concurrency is not None:
+            self.concurrency = concurrency
+        if profile:
+            if profile is True:
+                profile = self.path.cache('profile.json')
+            self.profiler = Profiler(profile)
+        manifest = Manifest(manifest_path)
+        if incremental:
+            manifest.load()
+        if atomic:
+            self.path.build = NoisePath(output.stage(build_path))
 
-        static_path = str(self.path.static)
-        if os.path.exists(static_path):
-            shutil.copytree(static_path, build_path)
-        else:
-            os.mkdir(build_path)
+        try:
+            target = str(self.path.build)
+            os.makedirs(target, exist_ok=True)
+            keep = set()
+            static_path = str(self.path.static)
+            self.assets = None
+            self.minifier = None
+            if minify:
+                from noise.minify import Minifier
+                self.minifier = Minifier(self.path.cache('minify'))
+            self.render_cache = None
+            if render_cache:
+                from noise.cache import SIZE, RenderCache
+                self.render_cache = RenderCache(render_cache, render_cache_size or SIZE,
+                                                root=self.path)
+            rename = None
+            if fingerprint and os.path.exists(static_path):
+                from noise.fingerprint import Assets
+                self.assets = Assets(self.path.cache('assets.json'))
+                names = self.assets.scan(static_path)
+                rename = {name: None if name in self.assets.styles else hashed
+                          for name, hashed in names.items()}
+            if os.path.exists(static_path) and index == 0:
+                if self.minifier is not None:
+                    rename = rename or {}
+                    rename.update((name, None) for name in self.minifier.sources(static_path))
+                report = static.sync(static_path, target, hardlink, checksum, rename=rename)
+                keep.update(report['files'])
+                if self.assets is not None:
+                    if self.minifier is not None:
+                        for name, css in self.assets.styles.items():
+                            self.assets.styles[name] = self.minifier.minify(css, '.css')
+                    keep.update(self.assets.write(target))
+                if self.minifier is not None:
+                    keep.update(self.minifier.static(static_path, target, self.assets))
 
-        for route, page in self.routes.items():
-            if type(page) is not Page:
-                callback = page
-                page = Page(self, route)
-                callback(page)
-            page.render()
-            log.info("Built %s", page.path)
+            pages = self.pages()
+            if shard is not None:
+                from noise.shard import MANIFEST, shard_of
+                pages = ((route, page) for route, page in pages
+                         if shard_of(route, count) == index)
+                keep.add('/' + MANIFEST)
+            built = self._render(pages, manifest, incremental, jobs, keep)
+
+            for route in manifest.stale(keep):
+                path = self.path.build(route)
+                if os.path.exists(path):
+                    os.remove(path)
+                    log.info("Removed %s", path)
+                for ext in EXTENSIONS:
+                    if os.path.exists(path + ext):
+                        os.remove(path + ext)
+                manifest.remove(route)
+                built.append(route)
+            manifest.save()
+
+            if compress:
+                keep.update([route + ext for route in keep for ext in EXTENSIONS])
+            for route in output.prune(target, keep):
+                log.info("Removed %s", self.path.build(route))
+
+            if compress:
+                compress_tree(target)
+            if shard is not None:
+                from noise.shard import write
+                write(target, index, count, manifest.entries)
+        finally:
+            self.path.build = original
+            profiler, self.profiler = self.profiler, None
+
+        if atomic:
+            output.commit(target, build_path, self.path.cache('changes.json'))
+        if profiler is not None:
+            profiler.save()
+        if self.minifier is not None:
+            log.info("Minified output, saved %d bytes", self.minifier.saved)
+        if self.render_cache is not None:
+            log.info("Render cache: %d hits, %d misses",
+                     self.render_cache.hits, self.render_cache.misses)
+            self.render_cache.trim()
 
+        markdown = self.template.markdown
+        if markdown.hits or markdown.misses:
+            log.info("Markdown cache: %d hits, %d misses", markdown.hits, markdown.misses)
+        markdown.trim()
         log.info("Build complete")
+        return built
+
+    def update(self, changed):
+        manifest = Manifest(self.path.cache('manifest.json')).load()
+        static_path = os.path.abspath(str(self.path.static))
+        template_path = os.path.abspath(str(self.path.template))
+        updated, routes = [], set()
+        for path in map(os.path.abspath, changed):
+            if path.startswith(static_path + os.sep):
+                route = '/' + os.path.relpath(path, static_path)
+                target = self.path.build(route)
+                if os.path.exists(path):
+                    if not output.copy(path, target):
+                        continue
+                    log.info("Copied %s", target)
+                elif os.path.isdir(target):
+                    return updated + self.build(incremental=True)
+                elif os.path.exists(target):
+                    os.remove(target)
+                    log.info("Removed %s", target)
+                else:
+                    continue
+                updated.append(route)
+                continue
+            affected = manifest.affected(path)
+            if path.startswith(template_path + os.sep):
+                affected.add('/' + os.path.relpath(path, template_path))
+            if not affected or os.path.isdir(path) \
+                    or (self._listed(path) and not os.path.exists(path)):
+                log.debug("No routes depend on %s, rebuilding", path)
+                return updated + self.build(incremental=True)
+            routes |= affected
+
+        pages = ((route, page) for route, page in self.pages() if route in routes)
+        updated += self._render(pages, manifest, changed=changed)
+        manifest.save()
+        return updated
+
+    def _listed(self, path):
+        return any(collection.matches(path) for collection in self.collections.values())
+
+    def pages(self):
+        for route, page in self.routes.items():
+            if isinstance(page, Parameterized):
+                yield from page
+            else:
+                yield route, page
 
+    def lookup(self, route):
+        page = self.routes.get(route)
+        if page is not None and not isinstance(page, Parameterized):
+            return page
+        for page in self.routes.values():
+            if isinstance(page, Parameterized) and page.match(route):
+                for name, callback in page:
+                    if name == route:
+                        return callback
+        return None
 
-def load_project(path):
+    def _render(self, pages, manifest, incremental=False, jobs=1, seen=None, changed=None):
+        self.reset(changed)
+        if jobs > 1:
+            from noise.parallel import build
+            results = build(self, pages, manifest, incremental, jobs)
+        else:
+            from noise.aio import CONCURRENCY, prepare
+            results = (self._build(route, page, manifest, incremental)
+                       for route, page in prepare(self, pages, self.concurrency or CONCURRENCY))
+        built = []
+        for route, path, entry, changed, stats in results:
+            if seen is not None:
+                seen.add(route)
+            if self.profiler is not None:
+                self.profiler.add(route, stats)
+            for hook in self.hooks['post_render']:
+                hook(route, path, stats)
+            if entry is False:
+                log.debug("Skipped %s", path)
+                continue
+            if entry is not None:
+                manifest.record(route, entry)
+            if not changed:
+                log.debug("Unchanged %s", path)
+                continue
+            log.info("Built %s", path)
+            built.append(route)
+        return built
+
+    def render(self, route, page=None):
+        if page is None:
+            page = self.lookup(route)
+        if page is None:
+            raise KeyError(route)
+        page = self._page(route, page)
+        if page.template is None:
+            return page, set()
+        deps, _ = self._render_page(page, page.resolve(), write=False)
+        return page, deps
+
+    def _page(self, route, page):
+        if type(page) is not Page:
+            callback = page
+            page = Page(self, route)
+            with span('callback'):
+                result = callback(page)
+                if hasattr(result, '__await__'):
+                    from noise.aio import run
+                    run(result)
+        return page
+
+    def _render_page(self, page, template, write=True):
+        from noise.template import track_dependencies
+        with track_dependencies() as deps:
+            changed = page.render(write)
+        deps |= self.template.dependencies(template)
+        if page.template:
+            deps.add(os.path.abspath(page.template))
+        return deps, changed
+
+    def _build(self, route, page, manifest, incremental=False):
+        for hook in self.hooks['pre_render']:
+            hook(route)
+        enabled = self.profiler is not None or bool(self.hooks['post_render'])
+        with record(enabled) as stats:
+            route, path, entry, changed = self._build_page(route, page, manifest, incremental)
+        return route, path, entry, changed, stats
+
+    def _build_page(self, route, page, manifest, incremental=False):
+        page = self._page(route, page)
+        if page.template is None:
+            return route, page.path, None, page.render()
+        template = page.resolve()
+        variant = self._variant()
+        key = hash_data([template, variant] if variant else template)
+        data = hash_data(page.data)
+        if incremental and os.path.exists(page.path) \
+                and manifest.fresh(route, key, data):
+            return route, page.path, False, False
+        cache = self.render_cache
+        if cache is not None:
+            cache_key = self._cache_key(route, template, data, manifest, variant)
+            deps = cache.get(cache_key, page.path, manifest.stamp)
+            if deps is not None:
+                return route, page.path, manifest.entry(key, data, deps), True
+        deps, changed = self._render_page(page, template)
+        if cache is not None:
+            cache.set(cache_key, page.path, deps, manifest.stamp)
+        return route, page.path, manifest.entry(key, data, deps), changed
+
+    def _variant(self):
+        variant = []
+        if self.minifier is not None:
+            from noise.minify import VERSION
+            variant.append('minify-' + VERSION)
+        if self.assets is not None:
+            variant.append('fingerprint')
+        return ','.join(variant)
+
+    def _cache_key(self, route, template, data, manifest, variant):
+        from noise.template import MarkdownCache
+        deps = ['{}={}'.format(self.render_cache.relative(path), manifest.stamp(path))
+                for path in sorted(self.template.dependencies(template))]
+        return self.render_cache.key(__version__, MarkdownCache.config, variant,
+                                     route, hash_data(template), data, *deps)
+
+
+def load_project(path, app=None, changed=()):
     init_file = os.path.join(path, "__init__.py")
     if not os.path.exists(init_file):
         print("error: project not found at {}".format(path))
         sys.exit(1)
+    import importlib.util
+    changed = set(map(os.path.abspath, changed))
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, '__file__', None)
+        if filename and os.path.abspath(filename) in changed:
+            del sys.modules[name]
     spec = importlib.util.spec_from_file_location("noise_project", init_file)
     module = importlib.util.module_from_spec(spec)
-    sys.path.insert(0, path)
+    sys.modules[spec.name] = module
+    if path not in sys.path:
+        sys.path.insert(0, path)
     spec.loader.exec_module(module)
+    if app is not None and getattr(module, 'app', None) is not app:
+        app.adopt(module.app)
+        module.app = app
+    return module
+
+def reload_project(path, app, changed):
+    module = load_project(path, app, changed)
+    app.reset(changed)
     return module
 
 
 def main():
     import argparse
 
+    def shard(value):
+        from noise.shard import parse
+        try:
+            return parse(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
     parser = argparse.ArgumentParser(
         prog='noise',
         description="noise: a static webpage generator"
@@ -84,17 +433,61 @@ def main():
     subparsers = parser.add_subparsers(dest='action', help="action to perform")
     init_parser = subparsers.add_parser('init', help="initialize project directory")
     build_parser = subparsers.add_parser('build', help="build project")
+    compile_parser = subparsers.add_parser('compile', help="precompile templates")
     serve_parser = subparsers.add_parser('serve', help="build and serve with live reload")
+    merge_parser = subparsers.add_parser('merge', help="merge sharded build outputs into build/")
 
-    for p in (init_parser, build_parser, serve_parser):
+    for p in (init_parser, build_parser, compile_parser, serve_parser, merge_parser):
         p.add_argument('path', help="project directory path")
         p.add_argument('--verbose', action='store_true', help="enable verbose output")
 
+    build_parser.add_argument('--incremental', action='store_true',
+        help="only rebuild pages whose inputs changed")
+    build_parser.add_argument('--compress', action='store_true',
+        help="write precompressed .gz (and .br/.zst when available) siblings")
+    build_parser.add_argument('--atomic', action='store_true',
+        help="build into a staging directory, keep unchanged files and swap it into place")
+    build_parser.add_argument('--hardlink-static', action='store_true',
+        help="hardlink static files into build/ instead of copying them")
+    build_parser.add_argument('--checksum', action='store_true',
+        help="compare static files by content hash instead of size and mtime")
+    build_parser.add_argument('--profile', nargs='?', const=True, default=False, metavar='PATH',
+        help="record per-route timings and memory (default: .noise-cache/profile.json)")
+    build_parser.add_argument('--fingerprint', action='store_true',
+        help="rename static assets to name.<hash>.ext and rewrite references to them")
+    build_parser.add_argument('--minify', action='store_true',
+        help="minify rendered HTML and static CSS/JS")
+    build_parser.add_argument('--render-cache', metavar='DIR',
+        help="reuse rendered pages from a content-addressed cache in DIR")
+    build_parser.add_argument('--render-cache-size', type=int, default=1024, metavar='MB',
+        help="evict least recently used cache entries above this size (default: 1024)")
+    build_parser.add_argument('--shard', type=shard, metavar='I/N',
+        help="render only shard I of N into shards/I/ (static files go to shard 1)")
+    build_parser.add_argument('--concurrency', type=int, metavar='N',
+        help="number of async callbacks awaited at once (default: 16)")
+    build_parser.add_argument('-j', '--jobs', type=int, default=1,
+        help="number of render processes (default: 1)")
+
     serve_parser.add_argument('--host', default='127.0.0.1', help="host address (default: 127.0.0.1)")
     serve_parser.add_argument('--port', type=int, default=8000, help="port (default: 8000)")
+    serve_parser.add_argument('--ignore', action='append', default=[], metavar='NAME',
+        help="directory name to skip when watching for changes (repeatable)")
+    serve_parser.add_argument('--workers', type=int, default=32,
+        help="number of request handler threads (default: 32)")
+    serve_parser.add_argument('--lazy', action='store_true',
+        help="render pages on first request instead of building up front")
+    serve_parser.add_argument('--prerender', action='store_true',
+        help="with --lazy, render remaining pages in the background")
+    serve_parser.add_argument('--cache-size', type=int, default=256,
+        help="with --lazy, number of rendered pages kept in memory (default: 256)")
+
+    merge_parser.add_argument('shards', nargs='*', metavar='SHARD',
+        help="shard output directories (default: every directory in shards/)")
 
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     if args.verbose:
         logging.getLogger("noise").setLevel(logging.DEBUG)
 
@@ -102,20 +495,51 @@ def main():
         Noise(args.path).init()
     elif args.action == 'build':
         module = load_project(args.path)
-        module.app.build()
+        module.app.build(incremental=args.incremental, jobs=args.jobs,
+                         compress=args.compress, atomic=args.atomic,
+                         hardlink=args.hardlink_static, checksum=args.checksum,
+                         profile=args.profile, fingerprint=args.fingerprint,
+                         minify=args.minify, shard=args.shard,
+                         render_cache=args.render_cache,
+                         render_cache_size=args.render_cache_size * 1024 * 1024,
+                         concurrency=args.concurrency)
+    elif args.action == 'merge':
+        from noise.shard import merge
+        try:
+            merge(Noise(args.path), args.shards)
+        except ValueError as e:
+            print("error: {}".format(e))
+            sys.exit(1)
+    elif args.action == 'compile':
+        module = load_project(args.path)
+        module.app.compile()
     elif args.action == 'serve':
         module = load_project(args.path)
         app = module.app
-        app.build()
-        from noise.server import DevServer
-        def rebuild():
-            nonlocal app
-            module = load_project(args.path)
-            app = module.app
+        from noise.server import DevServer, PageCache
+        from noise.watch import IGNORE
+        ignore = IGNORE + tuple(args.ignore)
+        if args.lazy:
+            pages = PageCache(app, args.cache_size)
+            def rebuild(changed):
+                if not any(path.endswith('.py') for path in changed):
+                    return pages.invalidate(changed)
+                reload_project(args.path, app, changed)
+                pages.reset(app)
+            server = DevServer(str(app.path.static), app.path, rebuild,
+                               ignore=ignore, pages=pages, workers=args.workers)
+            if args.prerender:
+                pages.prerender()
+        else:
             app.build()
-        server = DevServer(str(app.path.build), app.path, rebuild)
+            def rebuild(changed):
+                if not any(path.endswith('.py') for path in changed):
+                    return app.update(changed)
+                reload_project(args.path, app, changed)
+                return app.build(incremental=True)
+            server = DevServer(str(app.path.build), app.path, rebuild,
+                               ignore=ignore, workers=args.workers)
         server.start(host=args.host, port=args.port)
 
-
 if __name__ == '__main__':
     main()
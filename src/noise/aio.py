@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import asyncio
+import inspect
+import itertools
+
+from noise.page import Page
+
+CONCURRENCY = 16
+
+
+def is_async(callback):
+    return inspect.iscoroutinefunction(callback)
+
+def run(awaitable):
+    return asyncio.run(awaitable)
+
+async def _call(app, route, callback):
+    page = Page(app, route)
+    await callback(page)
+    return route, page
+
+def _wait(loop, pending):
+    return loop.run_until_complete(
+        asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+
+def prepare(app, pages, limit=CONCURRENCY):
+    limit = max(limit or 1, 1)
+    loop, pending, order, counter = None, set(), {}, itertools.count()
+
+    def finished(done):
+        return [task.result() for task in sorted(done, key=order.pop)]
+
+    try:
+        for route, page in pages:
+            if type(page) is Page or not is_async(page):
+                yield route, page
+                continue
+            if loop is None:
+                loop = asyncio.new_event_loop()
+            task = loop.create_task(_call(app, route, page))
+            order[task] = next(counter)
+            pending.add(task)
+            if len(pending) >= limit:
+                done, pending = _wait(loop, pending)
+                yield from finished(done)
+        while pending:
+            done, pending = _wait(loop, pending)
+            yield from finished(done)
+    finally:
+        if loop is not None:
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
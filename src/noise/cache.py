@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import filecmp
+import hashlib
+import json
+import logging
+import os
+import time
+
+from noise.static import transfer
+
+log = logging.getLogger("noise")
+
+SIZE = 1024 * 1024 * 1024
+
+
+class RenderCache(object):
+    def __init__(self, path, size=SIZE, root=None, hardlink=True):
+        self.path = str(path)
+        self.size = size
+        self.root = root and os.path.abspath(str(root))
+        self.hardlink = hardlink
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, *parts):
+        sha = hashlib.sha1()
+        for part in parts:
+            sha.update(str(part).encode('utf-8'))
+            sha.update(b'\0')
+        return sha.hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def relative(self, path):
+        if self.root and path.startswith(self.root + os.sep):
+            return os.path.relpath(path, self.root)
+        return path
+
+    def absolute(self, path):
+        if self.root and not os.path.isabs(path):
+            return os.path.join(self.root, path)
+        return path
+
+    def _place(self, src, dst):
+        try:
+            if os.path.samefile(src, dst) or filecmp.cmp(src, dst, shallow=False):
+                return
+        except OSError:
+            pass
+        transfer(src, dst, self.hardlink)
+
+    def get(self, key, target, stamp):
+        path = self._file(key)
+        try:
+            with open(path + '.json', 'r') as f:
+                deps = {self.absolute(p): h for p, h in json.load(f).items()}
+            if all(stamp(p) == h for p, h in deps.items()):
+                self._place(path, str(target))
+                os.utime(path, (time.time(), os.stat(path).st_mtime))
+                self.hits += 1
+                return set(deps)
+        except (OSError, ValueError):
+            pass
+        self.misses += 1
+        return None
+
+    def set(self, key, source, deps, stamp):
+        path = self._file(key)
+        try:
+            transfer(str(source), path, self.hardlink)
+            tmp = '{}.{}.tmp'.format(path + '.json', os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump({self.relative(p): stamp(p) for p in sorted(deps)}, f)
+            os.replace(tmp, path + '.json')
+        except OSError as e:
+            log.warning("Could not store %s in render cache: %s", source, e)
+
+    def trim(self):
+        entries, total = [], 0
+        for dirpath, dirs, names in os.walk(self.path):
+            for name in names:
+                if name.endswith('.json') or name.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_atime, path, st.st_size))
+                total += st.st_size
+        entries.sort()
+        removed = 0
+        for _, path, size in entries:
+            if total <= self.size:
+                break
+            for name in (path + '.json', path):
+                if os.path.exists(name):
+                    os.remove(name)
+            total -= size
+            removed += 1
+        if removed:
+            log.info("Render cache: evicted %d entries", removed)
+        return removed
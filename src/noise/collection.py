@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+
+DELIMITER = b'---'
+
+
+def parse_value(text):
+    if text.startswith('[') and text.endswith(']'):
+        return [parse_value(item.strip()) for item in text[1:-1].split(',') if item.strip()]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def front_matter(path):
+    meta = {}
+    with open(path, 'rb') as f:
+        if f.readline().rstrip() != DELIMITER:
+            return {}, 0
+        for line in iter(f.readline, b''):
+            if line.rstrip() == DELIMITER:
+                return meta, f.tell()
+            key, sep, value = line.decode('utf-8').partition(':')
+            if sep and key.strip():
+                meta[key.strip()] = parse_value(value.strip())
+    return {}, 0
+
+
+class Entry(object):
+    __slots__ = ('path', 'name', 'meta', 'offset')
+
+    def __init__(self, path, meta, offset):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.meta = meta
+        self.offset = offset
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in self.__slots__:
+            raise AttributeError(name)
+        try:
+            return self.meta[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, name):
+        return self.meta[name]
+
+    def __repr__(self):
+        return 'Entry({!r}, {})'.format(self.path, json.dumps(self.meta, sort_keys=True))
+
+    @property
+    def body(self):
+        from noise.template import record_dependency
+        record_dependency(self.path)
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            return f.read().decode('utf-8')
+
+
+class Collection(object):
+    def __init__(self, app, pattern, entries=None):
+        self.app = app
+        self.pattern = pattern
+        self._entries = entries
+        self._root = entries is None
+
+    @property
+    def index_path(self):
+        name = hashlib.sha1(self.pattern.encode('utf-8')).hexdigest()
+        return self.app.path.cache('collections/{}.json'.format(name))
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self.scan()
+        return self._entries
+
+    def scan(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        root = str(self.app.path)
+        fresh, entries = {}, []
+        for path in sorted(glob.glob(os.path.join(root, self.pattern), recursive=True)):
+            if not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            stamp = [st.st_mtime_ns, st.st_size]
+            name = os.path.relpath(path, root)
+            cached = index.get(name)
+            if cached is None or cached[0] != stamp:
+                cached = [stamp] + list(front_matter(path))
+            fresh[name] = cached
+            entries.append(Entry(path, cached[1], cached[2]))
+        if fresh != index:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp = '{}.{}.tmp'.format(self.index_path, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump(fresh, f, separators=(',', ':'))
+            os.replace(tmp, self.index_path)
+        return entries
+
+    def reset(self):
+        if self._root:
+            self._entries = None
+
+    def matches(self, path):
+        name = os.path.relpath(os.path.abspath(path), os.path.abspath(str(self.app.path)))
+        name = name.replace(os.sep, '/')
+        return fnmatch.fnmatch(name, self.pattern.replace('**/', ''))
+
+    def view(self, entries):
+        return Collection(self.app, self.pattern, entries)
+
+    def get(self, name):
+        for entry in self.entries:
+            if entry.name == name:
+                return entry
+        return None
+
+    def sort(self, key, reverse=False):
+        if not callable(key):
+            field = key
+            key = lambda entry: (entry.meta.get(field) is None, entry.meta.get(field))
+        return self.view(sorted(self.entries, key=key, reverse=reverse))
+
+    def filter(self, func=None, **meta):
+        def match(entry):
+            for key, value in meta.items():
+                actual = entry.meta.get(key)
+                if actual != value and not (isinstance(actual, list) and value in actual):
+                    return False
+            return func is None or func(entry)
+        return self.view([entry for entry in self.entries if match(entry)])
+
+    def paginate(self, size):
+        entries = self.entries
+        return [self.view(entries[i:i + size]) for i in range(0, len(entries), size)] \
+            or [self.view([])]
+
+    def __iter__(self):
+        from noise.template import record_dependency
+        for entry in self.entries:
+            record_dependency(entry.path)
+            yield entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view(self.entries[index])
+        return self.entries[index]
+
+    def __repr__(self):
+        sha = hashlib.sha1()
+        for entry in self.entries:
+            sha.update(repr(entry).encode('utf-8'))
+        return 'Collection({!r}, {})'.format(self.pattern, sha.hexdigest())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import gzip
+import logging
+import mimetypes
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("noise")
+
+MIN_SIZE = 1024
+
+COMPRESSIBLE = (
+    'application/javascript',
+    'application/json',
+    'application/manifest+json',
+    'application/rss+xml',
+    'application/atom+xml',
+    'application/xml',
+    'application/wasm',
+    'image/svg+xml',
+    'image/x-icon',
+    'font/ttf',
+    'font/otf',
+)
+
+
+def _gzip(data):
+    return gzip.compress(data, 9, mtime=0)
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return lambda data: brotli.compress(data, quality=11)
+
+def _zstd():
+    try:
+        from compression import zstd
+        return lambda data: zstd.compress(data, 19)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard.ZstdCompressor(level=19).compress
+
+ENCODINGS = [(encoding, ext, compress) for encoding, ext, compress in (
+    ('br', '.br', _brotli()),
+    ('zstd', '.zst', _zstd()),
+    ('gzip', '.gz', _gzip),
+) if compress is not None]
+
+EXTENSIONS = ('.br', '.zst', '.gz')
+
+
+def compressible(path):
+    ctype, encoding = mimetypes.guess_type(path)
+    if not ctype or encoding:
+        return False
+    return ctype.startswith('text/') or ctype in COMPRESSIBLE
+
+def fresh(path, sibling):
+    try:
+        return os.stat(sibling).st_mtime_ns == os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+def compress(path, min_size=MIN_SIZE):
+    st = os.stat(path)
+    small = st.st_size < min_size
+    saved = 0
+    data = None
+    for encoding, ext, func in ENCODINGS:
+        sibling = path + ext
+        if not small and fresh(path, sibling):
+            continue
+        if not small:
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            output = func(data)
+        if small or len(output) >= len(data):
+            if os.path.exists(sibling):
+                os.remove(sibling)
+            continue
+        tmp = sibling + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(output)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, sibling)
+        saved += len(data) - len(output)
+    return saved
+
+def compress_tree(root, min_size=MIN_SIZE, workers=None):
+    paths = []
+    for dirpath, dirs, files in os.walk(str(root)):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            if compressible(path):
+                paths.append(path)
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        saved = [n for n in pool.map(lambda path: compress(path, min_size), paths) if n]
+    log.info("Precompressed %d files (%s), saved %d bytes",
+             len(saved), ', '.join(e for e, _, _ in ENCODINGS), sum(saved))
+    return sum(saved)
+
+def accepted(header):
+    encodings = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            encodings[name.strip().lower()] = q
+    return {name for name, q in encodings.items() if q > 0}
+
+def negotiate(path, header):
+    encodings = accepted(header)
+    for encoding, ext, _ in ENCODINGS:
+        if encoding in encodings or '*' in encodings:
+            if fresh(path, path + ext):
+                return encoding, path + ext
+    return None, path
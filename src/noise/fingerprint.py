@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+
+from noise import output
+from noise.manifest import hash_file
+
+log = logging.getLogger("noise")
+
+ASSETS = (
+    '.css', '.js', '.mjs', '.map',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg',
+    '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.mp3', '.mp4', '.webm',
+)
+LENGTH = 8
+MANIFEST = 'assets.json'
+
+REFERENCE = re.compile(
+    r'''(?P<prefix>\b(?:src|href|poster)\s*=\s*["']?|url\(\s*["']?)(?P<url>[^"'()\s>?#]+)''')
+
+
+def fingerprinted(name, digest):
+    root, ext = posixpath.splitext(name)
+    return '{}.{}{}'.format(root, digest[:LENGTH], ext)
+
+
+class Assets(object):
+    def __init__(self, path):
+        self.path = str(path)
+        self.root = None
+        self.names = {}
+        self.styles = {}
+
+    def scan(self, root):
+        self.root = str(root)
+        self.names, self.styles = {}, {}
+        try:
+            with open(self.path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+        fresh, styles, hashed = {}, [], 0
+        for route, path in sorted(output.files(self.root)):
+            name = route.lstrip('/')
+            ext = posixpath.splitext(name)[1].lower()
+            if ext not in ASSETS:
+                continue
+            if ext == '.css':
+                styles.append(name)
+                continue
+            st = os.stat(path)
+            stamp = [st.st_mtime_ns, st.st_size]
+            cached = cache.get(name)
+            if cached is None or cached[:2] != stamp:
+                cached = stamp + [hash_file(path)]
+                hashed += 1
+            fresh[name] = cached
+            self.names[name] = fingerprinted(name, cached[2])
+
+        for name in styles:
+            with open(os.path.join(self.root, name), 'r', encoding='utf-8') as f:
+                css = self.rewrite(f.read(), posixpath.dirname(name), record=False)
+            self.styles[name] = css
+            digest = hashlib.sha1(css.encode('utf-8')).hexdigest()
+            self.names[name] = fingerprinted(name, digest)
+
+        if fresh != cache:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump(fresh, f, separators=(',', ':'))
+        log.debug("Fingerprinted %d assets, %d rehashed", len(self.names), hashed)
+        return self.names
+
+    def write(self, target):
+        routes = ['/' + MANIFEST]
+        for name, css in self.styles.items():
+            output.write(os.path.join(str(target), self.names[name]), css)
+            routes.append('/' + self.names[name])
+        output.write(os.path.join(str(target), MANIFEST),
+                     json.dumps(self.names, indent=2, sort_keys=True))
+        return routes
+
+    def url(self, name):
+        name = name.lstrip('/')
+        if name in self.names:
+            from noise.template import record_dependency
+            record_dependency(os.path.join(self.root, name))
+        return '/' + self.names.get(name, name)
+
+    def rewrite(self, text, base='', record=True):
+        from noise.template import record_dependency
+        def replace(match):
+            url = match.group('url')
+            if '//' in url or ':' in url:
+                return match.group(0)
+            if url.startswith('/'):
+                name = url.lstrip('/')
+            else:
+                name = posixpath.normpath(posixpath.join(base, url))
+            hashed = self.names.get(name)
+            if hashed is None:
+                return match.group(0)
+            if record:
+                record_dependency(os.path.join(self.root, name))
+            return match.group('prefix') + url[:url.rfind('/') + 1] + posixpath.basename(hashed)
+        return REFERENCE.sub(replace, text)
+
+    def stream(self, chunks, base=''):
+        tail = ''
+        for chunk in chunks:
+            chunk = tail + chunk
+            cut = chunk.rfind('<')
+            if cut <= 0:
+                tail = chunk
+                continue
+            yield self.rewrite(chunk[:cut], base)
+            tail = chunk[cut:]
+        if tail:
+            yield self.rewrite(tail, base)
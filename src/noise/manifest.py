@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import hashlib
+import json
+import os
+
+
+def hash_data(data):
+    data = json.dumps(data, sort_keys=True, default=repr)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+def hash_file(path):
+    sha = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha.update(chunk)
+    except OSError:
+        return None
+    return sha.hexdigest()
+
+
+class Manifest(object):
+    def __init__(self, path):
+        self.path = str(path)
+        self.entries = {}
+        self._stamps = {}
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def stamp(self, path):
+        if path not in self._stamps:
+            self._stamps[path] = hash_file(path)
+        return self._stamps[path]
+
+    def fresh(self, route, template, data):
+        entry = self.entries.get(route)
+        if not entry:
+            return False
+        if entry['template'] != template or entry['data'] != data:
+            return False
+        for path, stamp in entry['deps'].items():
+            if self.stamp(path) != stamp:
+                return False
+        return True
+
+    def entry(self, template, data, deps):
+        return {
+            'template': template,
+            'data': data,
+            'deps': {path: self.stamp(path) for path in sorted(deps)}
+        }
+
+    def record(self, route, entry):
+        self.entries[route] = entry
+
+    def affected(self, path):
+        return {route for route, entry in self.entries.items() if path in entry['deps']}
+
+    def stale(self, routes):
+        return [route for route in self.entries if route not in routes]
+
+    def remove(self, route):
+        self.entries.pop(route, None)
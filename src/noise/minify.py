@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import hashlib
+import logging
+import os
+import posixpath
+import re
+
+from noise import output
+
+log = logging.getLogger("noise")
+
+VERSION = '1'
+
+BLOCK = frozenset((
+    '!doctype', 'address', 'article', 'aside', 'base', 'blockquote', 'body', 'br', 'dd',
+    'details', 'dialog', 'div', 'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'head', 'header', 'hgroup', 'hr', 'html',
+    'li', 'link', 'main', 'meta', 'nav', 'noscript', 'ol', 'option', 'p', 'script',
+    'section', 'style', 'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'title',
+    'tr', 'ul',
+))
+
+TOKEN = re.compile(
+    r'<!--.*?-->|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>|<[^>]*>', re.S | re.I)
+RAW = re.compile(r'<(pre|textarea|script|style)\b', re.I)
+NAME = re.compile(r'</?([!\w-]+)')
+SPACE = re.compile(r'\s+')
+CSS_TOKEN = re.compile(
+    r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*!.*?\*/)|/\*.*?\*/''', re.S)
+CSS_PUNCTUATION = re.compile(r' ?([{};,>]) ?')
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group(0) else ' '
+
+def _text(text, before, after):
+    if before in BLOCK:
+        text = text.lstrip()
+    if after in BLOCK:
+        text = text.rstrip()
+    return SPACE.sub(_collapse, text)
+
+def _style(match):
+    token = match.group(0)
+    start = token.index('>') + 1
+    end = token.lower().rindex('</')
+    return token[:start] + css(token[start:end]) + token[end:]
+
+def _html(text, before=None, partial=False):
+    pieces = []
+    position = 0
+    for match in TOKEN.finditer(text):
+        if match.start() > position:
+            pieces.append((None, text[position:match.start()]))
+        position = match.end()
+        token = match.group(0)
+        if token.startswith('<!--') and not token.startswith('<!--['):
+            continue
+        if (match.group(1) or '').lower() == 'style':
+            token = _style(match)
+        name = NAME.match(token)
+        pieces.append((name.group(1).lower() if name else '', token))
+    if position < len(text):
+        pieces.append((None, text[position:]))
+    rest = ''
+    if partial:
+        while pieces and pieces[-1][0] is None:
+            rest = pieces.pop()[1] + rest
+
+    result = []
+    for i, (name, piece) in enumerate(pieces):
+        if name is not None:
+            result.append(piece)
+            continue
+        if i and pieces[i - 1][0] is None:
+            continue
+        j = i
+        while j + 1 < len(pieces) and pieces[j + 1][0] is None:
+            j += 1
+            piece += pieces[j][1]
+        if i:
+            before = pieces[i - 1][0]
+        after = pieces[j + 1][0] if j + 1 < len(pieces) else None
+        result.append(_text(piece, before, after))
+    last = pieces[-1][0] if pieces else before
+    return ''.join(result), last, rest
+
+def html(text, before=None):
+    return _html(text, before)[0]
+
+def _css(code):
+    code = CSS_PUNCTUATION.sub(r'\1', SPACE.sub(' ', code))
+    return code.replace(': ', ':').replace(';}', '}')
+
+def css(text):
+    result = []
+    position = 0
+    for match in CSS_TOKEN.finditer(text):
+        result.append(_css(text[position:match.start()]))
+        if match.group(1):
+            result.append(match.group(1))
+        position = match.end()
+    result.append(_css(text[position:]))
+    return ''.join(result).strip()
+
+def _jsmin():
+    try:
+        import rjsmin
+    except ImportError:
+        return None
+    return rjsmin.jsmin
+
+MINIFIERS = {
+    '.css': css,
+    '.js': _jsmin(),
+}
+
+def cut(text):
+    position = text.rfind('<')
+    raw = None
+    for raw in RAW.finditer(text, 0, max(position, 0)):
+        pass
+    closing = raw and re.search('</' + raw.group(1) + r'\s*>', text[raw.end():position], re.I)
+    if raw is not None and not closing:
+        position = raw.start()
+    comment = text.rfind('<!--')
+    if comment > text.rfind('-->'):
+        position = min(position, comment)
+    if position <= 0:
+        return 0
+    return text.rfind('>', 0, position) + 1
+
+
+class Minifier(object):
+    def __init__(self, path=None):
+        self.path = path and str(path)
+        self.saved = 0
+
+    def page(self, text, before=None, partial=False):
+        result, last, rest = _html(text, before, partial)
+        self.saved += len(text) - len(rest) - len(result)
+        return result, last, rest
+
+    def stream(self, chunks):
+        tail, before = '', None
+        for chunk in chunks:
+            text = tail + chunk
+            position = cut(text)
+            if position <= 0:
+                tail = text
+                continue
+            result, before, rest = self.page(text[:position], before, True)
+            tail = rest + text[position:]
+            if result:
+                yield result
+        if tail:
+            yield self.page(tail, before)[0]
+
+    def minify(self, text, ext):
+        func = MINIFIERS.get(ext)
+        if func is None:
+            return text
+        key = hashlib.sha1('\0'.join((VERSION, ext, text)).encode('utf-8')).hexdigest()
+        path = self.path and os.path.join(self.path, key[:2], key + ext)
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                result = f.read()
+        else:
+            result = func(text)
+            if path:
+                output.write(path, result)
+        self.saved += len(text.encode('utf-8')) - len(result.encode('utf-8'))
+        return result
+
+    def sources(self, root):
+        return [route.lstrip('/') for route, path in output.files(root)
+                if MINIFIERS.get(posixpath.splitext(route)[1].lower())]
+
+    def static(self, root, target, assets=None):
+        routes = []
+        for name in self.sources(root):
+            if assets is not None and name in assets.styles:
+                continue
+            with open(os.path.join(str(root), name), 'r', encoding='utf-8') as f:
+                text = f.read()
+            dest = assets.names.get(name, name) if assets is not None else name
+            text = self.minify(text, posixpath.splitext(name)[1].lower())
+            output.write(os.path.join(str(target), dest), text)
+            routes.append('/' + dest)
+        return routes
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import filecmp
+import json
+import logging
+import os
+import shutil
+
+from noise.profile import span
+
+log = logging.getLogger("noise")
+
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+BUFFER_SIZE = 65536
+
+
+def _replace(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def write(path, data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    def _write(tmp):
+        with open(tmp, 'wb') as f:
+            f.write(data)
+    _replace(path, _write)
+    return True
+
+def stream(path, chunks):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmp, 'wb', buffering=BUFFER_SIZE) as f:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                with span('write'):
+                    f.write(chunk)
+        with span('write'):
+            try:
+                if os.path.getsize(path) == os.path.getsize(tmp) \
+                        and filecmp.cmp(path, tmp, shallow=False):
+                    os.remove(tmp)
+                    return False
+            except OSError:
+                pass
+            os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return True
+
+def copy(src, dst):
+    try:
+        if filecmp.cmp(src, dst, shallow=False):
+            return False
+    except OSError:
+        pass
+    _replace(dst, lambda tmp: shutil.copy2(src, tmp))
+    return True
+
+def files(root):
+    root = str(root)
+    for dirpath, dirs, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            yield '/' + os.path.relpath(path, root).replace(os.sep, '/'), path
+
+def stage(path):
+    path = str(path)
+    staging = os.path.join(os.path.dirname(path), '.{}-stage'.format(os.path.basename(path)))
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    if os.path.exists(path):
+        shutil.copytree(path, staging, copy_function=os.link)
+    else:
+        os.makedirs(staging)
+    return staging
+
+def prune(root, keep):
+    removed = []
+    for route, path in list(files(root)):
+        if route not in keep:
+            os.remove(path)
+            removed.append(route)
+    for dirpath, dirs, names in os.walk(str(root), topdown=False):
+        if dirpath != str(root) and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return removed
+
+def diff(old, new):
+    old = dict(files(old)) if os.path.exists(str(old)) else {}
+    new = dict(files(new))
+    changes = {'added': [], 'changed': [], 'removed': sorted(set(old) - set(new))}
+    for route, path in sorted(new.items()):
+        if route not in old:
+            changes['added'].append(route)
+            continue
+        a, b = os.stat(old[route]), os.stat(path)
+        if (a.st_dev, a.st_ino) == (b.st_dev, b.st_ino):
+            continue
+        if not filecmp.cmp(old[route], path, shallow=False):
+            changes['changed'].append(route)
+    return changes
+
+def exchange(a, b):
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        renameat2 = None
+    if renameat2 is not None:
+        if renameat2(AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE) == 0:
+            return
+        log.debug("renameat2 failed: %s", os.strerror(ctypes.get_errno()))
+    tmp = b + '.old'
+    os.rename(b, tmp)
+    os.rename(a, b)
+    os.rename(tmp, a)
+
+def commit(staging, path, changes_path):
+    path = str(path)
+    changes = diff(path, staging)
+    if os.path.exists(path):
+        exchange(staging, path)
+        shutil.rmtree(staging)
+    else:
+        os.rename(staging, path)
+    os.makedirs(os.path.dirname(str(changes_path)), exist_ok=True)
+    with open(str(changes_path), 'w') as f:
+        json.dump(changes, f, indent=2, sort_keys=True)
+    log.info("Output: %d added, %d changed, %d removed",
+             len(changes['added']), len(changes['changed']), len(changes['removed']))
+    return changes
@@ -6,40 +6,66 @@ __copyright__ = "Copyright 2014-2026, Ryon Sherman"
 __license__   = "MIT"
 
 import os
+import posixpath
 
+from noise import output
+from noise.profile import span
 from noise.route import format_route
-from noise.template import TemplateNotFound
+
+HTML = ('.html', '.htm')
 
 
 class Page(object):
+    __slots__ = ('app', 'route', 'path', 'rendered', 'keep', 'data', 'template')
+
     def __init__(self, app, route, **kwargs):
         self.app = app
         self.route = format_route(route)
         self.path = app.path.build(route)
 
         self.rendered = False
+        self.keep = kwargs.get('keep', False)
 
         self.data = kwargs.get('data', {})
         self.template = kwargs.get('template', '')
 
-    def render(self):
-        if self.template is None:
-            self.rendered = True
-            return
-
+    def resolve(self):
         if not self.template:
             template = self.app.path.build.relative(self.path).lstrip('/')
-            if not os.path.exists(self.app.path.template(template)):
+            if not self.app.template.exists(template):
                 from noise.template import BOILERPLATE
                 template = BOILERPLATE
-        else:
-            if not os.path.exists(self.template):
-                raise TemplateNotFound(self.template)
-            with open(self.template, 'r') as f:
-                template = f.read()
+            return template
+        if not os.path.exists(self.template):
+            from jinja2.exceptions import TemplateNotFound
+            raise TemplateNotFound(self.template)
+        with open(self.template, 'r') as f:
+            return f.read()
 
-        self.rendered = self.app.template.render(template, **self.data)
+    def render(self, write=True):
+        if self.template is None:
+            self.rendered = True
+            return True
 
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        with open(self.path, 'w') as f:
-            f.write(self.rendered)
+        template = self.resolve()
+        assets = self.app.assets
+        base = posixpath.dirname(self.route).lstrip('/')
+        minifier = self.app.minifier if self.route.endswith(HTML) else None
+        if write and not self.keep:
+            chunks = self.app.template.generate(template, **self.data)
+            if assets is not None:
+                chunks = assets.stream(chunks, base)
+            if minifier is not None:
+                chunks = minifier.stream(chunks)
+            changed = output.stream(self.path, chunks)
+            self.rendered = True
+            return changed
+
+        self.rendered = self.app.template.render(template, **self.data)
+        if assets is not None:
+            self.rendered = assets.rewrite(self.rendered, base)
+        if minifier is not None:
+            self.rendered = minifier.page(self.rendered)[0]
+        if write:
+            with span('write'):
+                return output.write(self.path, self.rendered)
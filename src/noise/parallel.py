@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import logging
+import multiprocessing
+import pickle
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+log = logging.getLogger("noise")
+
+CHUNK_SIZE = 16
+
+_worker = {}
+
+
+def _init(app, manifest, incremental):
+    app.template.reset()
+    _worker.update(app=app, manifest=manifest, incremental=incremental)
+
+def _counters(app):
+    counters = [(app.template.markdown, 'hits'), (app.template.markdown, 'misses')]
+    if app.minifier is not None:
+        counters.append((app.minifier, 'saved'))
+    if app.render_cache is not None:
+        counters += [(app.render_cache, 'hits'), (app.render_cache, 'misses')]
+    return counters
+
+def _build(chunk):
+    from noise.aio import CONCURRENCY, prepare
+    app = _worker['app']
+    before = [getattr(obj, name) for obj, name in _counters(app)]
+    results = [app._build(route, page, _worker['manifest'], _worker['incremental'])
+               for route, page in prepare(app, chunk, app.concurrency or CONCURRENCY)]
+    return results, [getattr(obj, name) - value
+                     for (obj, name), value in zip(_counters(app), before)]
+
+def _picklable(obj):
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
+
+def _chunks(pages, size):
+    chunk = []
+    for route, page in pages:
+        if not _picklable(page):
+            if chunk:
+                yield chunk, True
+                chunk = []
+            log.debug("Rendering %s serially, callback cannot be pickled", route)
+            yield [(route, page)], False
+            continue
+        chunk.append((route, page))
+        if len(chunk) >= size:
+            yield chunk, True
+            chunk = []
+    if chunk:
+        yield chunk, True
+
+def build(app, pages, manifest, incremental, jobs, chunk_size=CHUNK_SIZE):
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        log.warning("Parallel builds require the fork start method, rendering serially")
+        for route, page in pages:
+            yield app._build(route, page, manifest, incremental)
+        return
+
+    def results(future):
+        results, deltas = future.result()
+        for (obj, name), delta in zip(_counters(app), deltas):
+            setattr(obj, name, getattr(obj, name) + delta)
+        return results
+
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(jobs, mp_context=context, initializer=_init,
+                             initargs=(app, manifest, incremental)) as pool:
+        pending = deque()
+        for chunk, picklable in _chunks(pages, chunk_size):
+            if picklable:
+                future = pool.submit(_build, chunk)
+            else:
+                future = Future()
+                try:
+                    future.set_result(([app._build(route, page, manifest, incremental)
+                                        for route, page in chunk], ()))
+                except Exception as e:
+                    future.set_exception(e)
+            pending.append(future)
+            while len(pending) > jobs * 2:
+                yield from results(pending.popleft())
+        while pending:
+            yield from results(pending.popleft())
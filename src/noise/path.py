@@ -39,6 +39,7 @@ class Path(NoisePath):
         NoisePath.__init__(self, path)
         for p in self.paths:
             setattr(self, p, NoisePath(self(p)))
+        self.cache = NoisePath(self('.noise-cache'))
 
     def init(self):
         dirs = [self.path, self.build, self.static, self.template]
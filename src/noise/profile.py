@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+
+log = logging.getLogger("noise")
+
+SPANS = ('callback', 'template', 'render', 'markdown', 'write')
+
+_local = threading.local()
+
+
+@contextmanager
+def span(name, label=None):
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stats[name] = stats.get(name, 0.0) + elapsed
+        if label is not None:
+            labels = stats.setdefault('labels', {}).setdefault(name, {})
+            labels[label] = labels.get(label, 0.0) + elapsed
+
+@contextmanager
+def record(enabled=True):
+    if not enabled:
+        yield None
+        return
+    stats = {}
+    outer, _local.stats = getattr(_local, 'stats', None), stats
+    tracing = tracemalloc.is_tracing() and hasattr(tracemalloc, 'reset_peak')
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats['total'] = time.perf_counter() - start
+        if tracing:
+            stats['memory'] = tracemalloc.get_traced_memory()[1]
+        _local.stats = outer
+
+
+class Profiler(object):
+    def __init__(self, path):
+        self.path = str(path)
+        self.routes = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def add(self, route, stats):
+        if stats is not None:
+            self.routes[route] = stats
+
+    def totals(self, name):
+        totals = {}
+        for stats in self.routes.values():
+            for label, elapsed in stats.get('labels', {}).get(name, {}).items():
+                totals[label] = totals.get(label, 0.0) + elapsed
+        return totals
+
+    def report(self):
+        return {
+            'routes': self.routes,
+            'templates': self.totals('template'),
+            'markdown': self.totals('markdown'),
+            'totals': {name: sum(s.get(name, 0.0) for s in self.routes.values())
+                       for name in SPANS + ('total',)},
+            'peak_memory': max([s.get('memory', 0) for s in self.routes.values()] or [0]),
+        }
+
+    def save(self, top=10):
+        report = self.report()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        tracemalloc.stop()
+
+        log.info("Slowest routes:")
+        routes = sorted(self.routes.items(), key=lambda item: -item[1]['total'])
+        for route, stats in routes[:top]:
+            log.info("  %8.1fms %s (%s, peak %.1f KiB)", stats['total'] * 1000, route,
+                     ', '.join('{} {:.1f}ms'.format(name, stats[name] * 1000)
+                               for name in SPANS if name in stats),
+                     stats.get('memory', 0) / 1024)
+        for name in ('templates', 'markdown'):
+            items = sorted(report[name].items(), key=lambda item: -item[1])
+            if items:
+                log.info("Slowest %s:", name)
+            for label, elapsed in items[:top]:
+                log.info("  %8.1fms %s", elapsed * 1000, label)
+        log.info("Profile written to %s", self.path)
+        return report
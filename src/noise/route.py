@@ -6,6 +6,9 @@ __copyright__ = "Copyright 2014-2026, Ryon Sherman"
 __license__   = "MIT"
 
 import os
+import re
+
+from functools import partial
 
 BOILERPLATE = """
 #!/usr/bin/env python3
@@ -31,12 +34,39 @@ def format_route(route):
         route += '.html'
     return route
 
+PARAMETER = re.compile(r'<(\w+)>')
+
+class Parameterized(object):
+    def __init__(self, route, callback, params):
+        self.route = route
+        self.callback = callback
+        self.params = params
+        parts = PARAMETER.split(route)
+        self.pattern = re.compile(''.join(
+            '(?P<{}>[^/]+)'.format(part) if i % 2 else re.escape(part)
+            for i, part in enumerate(parts)))
+
+    def __iter__(self):
+        params = self.params() if callable(self.params) else self.params
+        for values in params:
+            yield self.format(values), partial(self.callback, **values)
+
+    def format(self, values):
+        return PARAMETER.sub(lambda m: str(values[m.group(1)]), self.route)
+
+    def match(self, route):
+        return self.pattern.fullmatch(route) is not None
+
 class Route(object):
     def __init__(self, app):
         self.app = app
 
-    def __call__(self, route):
+    def __call__(self, route, params=None):
         def decorator(callback):
-            self.app.routes[format_route(route)] = callback
+            key = format_route(route)
+            if params is not None:
+                self.app.routes[key] = Parameterized(key, callback, params)
+            else:
+                self.app.routes[key] = callback
             return callback
         return decorator
@@ -1,18 +1,29 @@
+import email.utils
 import logging
 import os
+import selectors
+import socket
 import threading
 import time
 import traceback
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from io import BytesIO
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from noise.compress import compressible, negotiate
+from noise.route import format_route
+from noise.watch import IGNORE, watcher
 
 log = logging.getLogger("noise")
 
 LIVERELOAD_SCRIPT = """
 <script>
 (function() {
-  var evtSource = new EventSource('/__noise_reload');
+  var evtSource = new EventSource('/__noise_reload?path=' + encodeURIComponent(window.location.pathname));
   evtSource.addEventListener('message', function(e) {
     if (e.data === 'reload') {
       window.location.reload();
@@ -23,29 +34,181 @@ LIVERELOAD_SCRIPT = """
 """
 
 
+def inject(content):
+    return content.replace(b'</body>', LIVERELOAD_SCRIPT.encode() + b'</body>')
+
+def parse_range(header, size):
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+class PageCache:
+    def __init__(self, app, size=256):
+        self.app = app
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, route):
+        with self._lock:
+            if route in self._entries:
+                self._entries.move_to_end(route)
+                return self._entries[route][0]
+        callback = self.app.lookup(route)
+        if callback is None:
+            return None
+        page, deps = self.app.render(route, callback)
+        if page.template is None:
+            return None
+        content = page.rendered.encode('utf-8')
+        with self._lock:
+            self._entries[route] = (content, deps)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        log.info("Rendered %s", route)
+        return content
+
+    def invalidate(self, changed):
+        self.app.reset(changed)
+        static_path = os.path.abspath(str(self.app.path.static))
+        template_path = os.path.abspath(str(self.app.path.template))
+        updated = []
+        with self._lock:
+            for path in map(os.path.abspath, changed):
+                if path.startswith(static_path + os.sep):
+                    updated.append('/' + os.path.relpath(path, static_path))
+                    continue
+                if self.app._listed(path) and (not os.path.exists(path) or not any(
+                        path in deps for content, deps in self._entries.values())):
+                    self._entries.clear()
+                    return None
+                name = None
+                if path.startswith(template_path + os.sep):
+                    name = '/' + os.path.relpath(path, template_path)
+                for route, (content, deps) in list(self._entries.items()):
+                    if path in deps or route == name:
+                        del self._entries[route]
+                        updated.append(route)
+        return updated
+
+    def reset(self, app):
+        with self._lock:
+            self.app = app
+            self._entries.clear()
+
+    def prerender(self):
+        thread = threading.Thread(target=self._prerender, daemon=True)
+        thread.start()
+        return thread
+
+    def _prerender(self):
+        for route, _ in self.app.pages():
+            if len(self._entries) >= self.size:
+                break
+            try:
+                self.get(route)
+            except Exception as e:
+                log.error("Prerender of %s failed: %s", route, e)
+            time.sleep(0.01)
+
+
+class DevHTTPServer(HTTPServer):
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, workers=32):
+        HTTPServer.__init__(self, address, handler, bind_and_activate=False)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='noise-http')
+        self._detached = set()
+        self._lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def detach(self, request):
+        with self._lock:
+            self._detached.add(request)
+
+    def shutdown_request(self, request):
+        with self._lock:
+            if request in self._detached:
+                self._detached.discard(request)
+                return
+        HTTPServer.shutdown_request(self, request)
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.pool.shutdown(wait=False)
+
+
 class DevServer:
-    def __init__(self, build_path, source_root, rebuild):
+    def __init__(self, build_path, source_root, rebuild, ignore=IGNORE, pages=None, workers=32):
         self.build_path = build_path
         self.source_root = source_root
         self.rebuild = rebuild
+        self.ignore = ignore
+        self.pages = pages
+        self.workers = workers
         self._listeners = []
+        self._html = OrderedDict()
         self._lock = threading.Lock()
 
-    def start(self, host='127.0.0.1', port=8000):
+    def html(self, path, st, size=256):
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._html.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._html.move_to_end(path)
+                return cached[1]
+        with open(path, 'rb') as f:
+            content = inject(f.read())
+        with self._lock:
+            self._html[path] = (stamp, content)
+            while len(self._html) > size:
+                self._html.popitem(last=False)
+        return content
+
+    def bind(self, host='127.0.0.1', port=8000):
         handler = partial(DevServerHandler, self, directory=str(self.build_path))
+        httpd = DevHTTPServer((host, port), handler, self.workers)
+        try:
+            httpd.server_bind()
+            httpd.server_activate()
+        except OSError:
+            httpd.server_close()
+            raise
+        return httpd
 
+    def start(self, host='127.0.0.1', port=8000):
         try:
-            httpd = HTTPServer((host, port), handler, bind_and_activate=False)
+            httpd = self.bind(host, port)
         except OSError as e:
             log.error("Failed to bind to %s:%d — %s", host, port, e)
             return
 
-        httpd.allow_reuse_address = True
-        httpd.server_bind()
-        httpd.server_activate()
-
-        watcher = threading.Thread(target=self._watch, daemon=True)
-        watcher.start()
+        watcher(self.source_root, self._changed, self.ignore).start()
 
         addr = httpd.server_address
         log.info("Serving at http://%s:%d", addr[0], addr[1])
@@ -54,60 +217,94 @@ class DevServer:
             httpd.serve_forever()
         except KeyboardInterrupt:
             log.info("Shutting down...")
-            httpd.shutdown()
-
-    def _watch(self):
-        mtimes = {}
-        while True:
-            time.sleep(1)
-            changed = False
-            paths = []
-            try:
-                for root, dirs, files in os.walk(str(self.source_root)):
-                    dirs[:] = [d for d in dirs if d not in ('build', '.git', '__pycache__', '.gradle')]
-                    for f in files:
-                        paths.append(os.path.join(root, f))
-            except OSError as e:
-                log.error("Watch error walking source tree: %s", e)
+        finally:
+            httpd.server_close()
+
+    def _changed(self, changed):
+        for path in changed:
+            log.debug("Changed %s", path)
+        log.info("Source change detected, rebuilding...")
+        try:
+            updated = self.rebuild(changed)
+        except Exception as e:
+            log.error("Rebuild failed: %s", e)
+            for line in traceback.format_exc().splitlines():
+                log.error("  %s", line)
+            return
+        if updated is not None and not updated:
+            log.info("Build complete, no pages changed")
+            return
+        log.info("Build complete, reloading browsers")
+        self.broadcast(updated)
+
+    def broadcast(self, updated=None):
+        self.prune()
+        with self._lock:
+            listeners, self._listeners = self._listeners, []
+        for sock, path in listeners:
+            if not self.affects(updated, path):
+                with self._lock:
+                    self._listeners.append((sock, path))
                 continue
-            for p in paths:
+            try:
+                sock.sendall(b'data: reload\n\n')
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    @staticmethod
+    def affects(updated, path):
+        if updated is None or path is None:
+            return True
+        path = format_route(unquote(path))
+        for route in updated:
+            if route == path or not route.endswith('.html'):
+                return True
+        return False
+
+    def add_listener(self, sock, path=None):
+        self.prune()
+        with self._lock:
+            self._listeners.append((sock, path))
+
+    @staticmethod
+    def _closed(socks):
+        closed = set()
+        with selectors.DefaultSelector() as selector:
+            for sock in socks:
                 try:
-                    mtime = os.stat(p).st_mtime
-                except OSError:
-                    continue
-                prev = mtimes.get(p)
-                if prev is None or mtime != prev:
-                    mtimes[p] = mtime
-                    changed = True
-            if changed:
-                log.info("Source change detected, rebuilding...")
+                    selector.register(sock, selectors.EVENT_READ)
+                except (ValueError, OSError):
+                    closed.add(sock)
+            for key, _ in selector.select(0):
                 try:
-                    self.rebuild()
-                    log.info("Build complete, reloading browsers")
-                except Exception as e:
-                    log.error("Rebuild failed: %s", e)
-                    for line in traceback.format_exc().splitlines():
-                        log.error("  %s", line)
-                    continue
-                with self._lock:
-                    for q in self._listeners:
-                        try:
-                            q.put_nowait(None)
-                        except Exception:
-                            pass
-                    self._listeners.clear()
-
-    def add_listener(self, q):
-        with self._lock:
-            self._listeners.append(q)
+                    if not key.fileobj.recv(1, socket.MSG_PEEK):
+                        closed.add(key.fileobj)
+                except OSError:
+                    closed.add(key.fileobj)
+        return closed
 
-    def remove_listener(self, q):
+    def prune(self):
         with self._lock:
-            if q in self._listeners:
-                self._listeners.remove(q)
+            socks = [sock for sock, _ in self._listeners]
+        closed = self._closed(socks) if socks else set()
+        if not closed:
+            return 0
+        with self._lock:
+            self._listeners = [(sock, path) for sock, path in self._listeners
+                               if sock not in closed]
+        for sock in closed:
+            sock.close()
+        log.debug("Dropped %d closed reload listeners", len(closed))
+        return len(closed)
 
 
 class DevServerHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    timeout = 5
+
     def __init__(self, server, *args, **kwargs):
         self._dev_server = server
         try:
@@ -116,60 +313,149 @@ class DevServerHandler(SimpleHTTPRequestHandler):
             pass
 
     def do_GET(self):
-        if self.path == '/__noise_reload':
-            self._sse_loop()
+        url = urlsplit(self.path)
+        if url.path == '/__noise_reload':
+            self._sse_loop(parse_qs(url.query).get('path', [None])[0])
         else:
             super().do_GET()
 
-    def _sse_loop(self):
+    def _sse_loop(self, page=None):
         self.send_response(200)
         self.send_header('Content-Type', 'text/event-stream')
         self.send_header('Cache-Control', 'no-cache')
         self.send_header('Connection', 'keep-alive')
         self.end_headers()
-        from queue import Queue
-        q = Queue()
-        self._dev_server.add_listener(q)
-        try:
-            while True:
-                msg = q.get()
-                if msg is None:
-                    self.wfile.write(b'data: reload\n\n')
-                    self.wfile.flush()
-                    break
-        except (BrokenPipeError, ConnectionResetError):
-            pass
-        finally:
-            self._dev_server.remove_listener(q)
+        self.wfile.flush()
+        self.close_connection = True
+        self.server.detach(self.connection)
+        self._dev_server.add_listener(self.connection, page)
 
     def send_head(self):
+        self._range = None
+        pages = self._dev_server.pages
+        if pages is not None:
+            route = format_route(unquote(urlsplit(self.path).path))
+            content = pages.get(route)
+            if content is not None:
+                content = inject(content)
+                return self._send_html(content, '"{:x}"'.format(zlib.crc32(content)))
         path = self.translate_path(self.path)
+        if os.path.isdir(path) and urlsplit(self.path).path.endswith('/'):
+            path = os.path.join(path, 'index.html')
         if not os.path.isfile(path):
             return super().send_head()
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            log.error("Error reading %s: %s", path, e)
+            self.send_error(404, "Not found")
+            return None
         ctype = self.guess_type(path)
+        encoding = None
+        vary = ctype != 'text/html' and compressible(path)
+        if vary:
+            encoding, variant = negotiate(path, self.headers.get('Accept-Encoding'))
+            if encoding is not None:
+                path, st = variant, os.stat(variant)
+        etag = '"{:x}-{:x}"'.format(st.st_mtime_ns, st.st_size)
         if ctype == 'text/html':
             try:
-                with open(path, 'rb') as f:
-                    content = f.read()
+                content = self._dev_server.html(path, st)
             except OSError as e:
                 log.error("Error reading %s: %s", path, e)
                 self.send_error(404, "Not found")
                 return None
-            injection = LIVERELOAD_SCRIPT.encode()
-            content = content.replace(b'</body>', injection + b'</body>')
-            f = BytesIO()
-            f.write(content)
-            f.seek(0)
-            self.send_response(200)
-            self.send_header('Content-Type', ctype + '; charset=utf-8')
-            self.send_header('Content-Length', str(len(content)))
-            self.send_header('Last-Modified', self.date_time_string(os.path.getmtime(path)))
-            self.end_headers()
-            return f
-        return super().send_head()
+            return self._send_html(content, etag, st.st_mtime)
+        return self._send_file(path, ctype, st, etag, encoding, vary)
+
+    def _not_modified(self, etag, mtime=None):
+        match = self.headers.get('If-None-Match')
+        if match is not None:
+            tags = [tag.strip() for tag in match.split(',')]
+            return etag in tags or '*' in tags
+        since = self.headers.get('If-Modified-Since')
+        if since is None or mtime is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(since)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+        return int(mtime) <= since.timestamp()
+
+    def _send_not_modified(self, etag, mtime=None):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        if mtime is not None:
+            self.send_header('Last-Modified', self.date_time_string(mtime))
+        self.end_headers()
+        return None
+
+    def _send_html(self, content, etag, mtime=None):
+        if self._not_modified(etag, mtime):
+            return self._send_not_modified(etag, mtime)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        if mtime is not None:
+            self.send_header('Last-Modified', self.date_time_string(mtime))
+        self.end_headers()
+        return BytesIO(content)
+
+    def _send_file(self, path, ctype, st, etag, encoding=None, vary=False):
+        if self._not_modified(etag, st.st_mtime):
+            return self._send_not_modified(etag, st.st_mtime)
+        size = st.st_size
+        start, end = 0, size - 1
+        byte_range = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if byte_range and (if_range is None or if_range == etag):
+            byte_range = parse_range(byte_range, size)
+            if byte_range is False:
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */{}'.format(size))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+            if byte_range is not None:
+                start, end = byte_range
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+        ranged = (start, end) != (0, size - 1)
+        self.send_response(206 if ranged else 200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        if vary:
+            self.send_header('Vary', 'Accept-Encoding')
+        if ranged:
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end, size))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.date_time_string(st.st_mtime))
+        self.end_headers()
+        self._range = (start, end - start + 1)
+        return f
+
+    def copyfile(self, source, outputfile):
+        if self._range is None:
+            return super().copyfile(source, outputfile)
+        offset, count = self._range
+        if count <= 0:
+            return
+        outputfile.flush()
+        self.connection.sendfile(source, offset, count)
 
     def log_message(self, fmt, *args):
         log.info(fmt, *args)
 
     def log_error(self, fmt, *args):
+        if fmt.startswith("Request timed out"):
+            log.debug(fmt, *args)
+            return
         log.error(fmt, *args)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import hashlib
+import json
+import logging
+import os
+
+from noise import output
+from noise.manifest import Manifest
+
+log = logging.getLogger("noise")
+
+MANIFEST = '.noise-shard.json'
+
+
+def parse(value):
+    index, sep, count = value.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError("invalid shard {!r}, expected i/n".format(value))
+    if not sep or count < 1 or not 1 <= index <= count:
+        raise ValueError("invalid shard {!r}, expected 1 <= i <= n".format(value))
+    return index - 1, count
+
+def shard_of(route, count):
+    return int(hashlib.sha1(route.encode('utf-8')).hexdigest()[:8], 16) % count
+
+def output_path(app, index):
+    return app.path('shards/{}'.format(index + 1))
+
+def write(target, index, count, entries):
+    files = sorted(route for route, _ in output.files(target) if route != '/' + MANIFEST)
+    output.write(os.path.join(str(target), MANIFEST), json.dumps({
+        'shard': index,
+        'count': count,
+        'files': files,
+        'entries': entries,
+    }, sort_keys=True))
+    return files
+
+def load(target):
+    try:
+        with open(os.path.join(str(target), MANIFEST), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        raise ValueError("no shard manifest in {}".format(target))
+
+def merge(app, paths=None):
+    from noise.static import transfer
+    if not paths:
+        root = app.path('shards')
+        names = os.listdir(root) if os.path.isdir(root) else []
+        paths = [os.path.join(root, name) for name in sorted(
+            (name for name in names if name.isdigit()), key=int)]
+    shards = [load(p) for p in paths]
+    if not shards:
+        raise ValueError("no shard outputs to merge")
+
+    counts = {shard['count'] for shard in shards}
+    indexes = sorted(shard['shard'] for shard in shards)
+    if len(counts) != 1 or indexes != list(range(counts.pop())):
+        raise ValueError("incomplete or inconsistent shards: {}".format(
+            ', '.join('{}/{}'.format(s['shard'] + 1, s['count']) for s in shards)))
+
+    owners, collisions = {}, []
+    for target, shard in zip(paths, shards):
+        for route in shard['files']:
+            if route in owners:
+                collisions.append("{} ({} and {})".format(route, owners[route], target))
+            else:
+                owners[route] = target
+    if collisions:
+        raise ValueError("shard outputs collide: {}".format(', '.join(collisions)))
+
+    build_path = str(app.path.build)
+    staging = output.stage(build_path)
+    for route, target in owners.items():
+        transfer(os.path.join(target, route.lstrip('/')), os.path.join(staging, route.lstrip('/')),
+                 hardlink=True)
+    output.prune(staging, set(owners))
+    output.commit(staging, build_path, app.path.cache('changes.json'))
+
+    manifest = Manifest(app.path.cache('manifest.json'))
+    for shard in shards:
+        manifest.entries.update(shard['entries'])
+    manifest.save()
+    log.info("Merged %d shards, %d files", len(shards), len(owners))
+    return sorted(owners)
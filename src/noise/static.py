@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import errno
+import logging
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+
+from noise.manifest import hash_file
+
+log = logging.getLogger("noise")
+
+FICLONE = 0x40049409
+FALLBACK = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM)
+
+COPIED, LINKED, SKIPPED = 'copied', 'linked', 'skipped'
+
+
+def unchanged(src, dst, checksum=False):
+    try:
+        a, b = os.stat(src), os.stat(dst)
+    except OSError:
+        return False
+    if (a.st_dev, a.st_ino) == (b.st_dev, b.st_ino):
+        return True
+    if a.st_size != b.st_size:
+        return False
+    if checksum:
+        return hash_file(src) == hash_file(dst)
+    return a.st_mtime_ns == b.st_mtime_ns
+
+def reflink(src, dst):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            return False
+    return True
+
+def copy_range(src, dst):
+    if hasattr(os, 'copy_file_range'):
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            size = os.fstat(s.fileno()).st_size
+            offset = 0
+            try:
+                while offset < size:
+                    n = os.copy_file_range(s.fileno(), d.fileno(), size - offset)
+                    if n == 0:
+                        break
+                    offset += n
+                return size
+            except OSError as e:
+                if offset or e.errno not in FALLBACK:
+                    raise
+    shutil.copyfile(src, dst)
+    return os.path.getsize(src)
+
+def transfer(src, dst, hardlink=False):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = '{}.{}.tmp'.format(dst, os.getpid())
+    try:
+        if hardlink:
+            try:
+                os.link(src, tmp)
+                os.replace(tmp, dst)
+                return LINKED, 0
+            except OSError:
+                pass
+        if reflink(src, tmp):
+            result = LINKED, 0
+        else:
+            result = COPIED, copy_range(src, tmp)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+        return result
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def sync(src, dst, hardlink=False, checksum=False, workers=None, rename=None):
+    src, dst = str(src), str(dst)
+    jobs = []
+    for dirpath, dirs, names in os.walk(src):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, src)
+            if rename is not None:
+                rel = rename.get(rel.replace(os.sep, '/'), rel)
+                if rel is None:
+                    continue
+            jobs.append((rel, path, os.path.join(dst, rel)))
+
+    def run(job):
+        rel, path, target = job
+        if unchanged(path, target, checksum):
+            return SKIPPED, 0
+        return transfer(path, target, hardlink)
+
+    report = {COPIED: 0, LINKED: 0, SKIPPED: 0, 'bytes': 0}
+    with ThreadPoolExecutor(workers or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        for status, size in pool.map(run, jobs):
+            report[status] += 1
+            report['bytes'] += size
+    log.info("Static: %d copied (%d bytes), %d linked, %d unchanged",
+             report[COPIED], report['bytes'], report[LINKED], report[SKIPPED])
+    report['files'] = ['/' + rel.replace(os.sep, '/') for rel, _, _ in jobs]
+    return report
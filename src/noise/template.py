@@ -5,11 +5,22 @@ __email__     = "ryon.sherman@gmail.com"
 __copyright__ = "Copyright 2014-2026, Ryon Sherman"
 __license__   = "MIT"
 
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
 import jinja2
-import markdown
 
-from jinja2.exceptions import TemplateNotFound
+from collections import OrderedDict
+from contextlib import contextmanager
+from jinja2 import meta
+from jinja2.utils import LRUCache
+
+from noise.profile import span
+
+log = logging.getLogger("noise")
 
 BOILERPLATE = """
 <!DOCTYPE html>
@@ -26,32 +37,275 @@ BOILERPLATE = """
 
 MD_EXTENSIONS = ['toc', 'abbr', 'tables', 'fenced_code']
 
+CHUNK_SIZE = 65536
+
+DISK_SIZE = 256 * 1024 * 1024
+
+_local = threading.local()
+
+@contextmanager
+def track_dependencies():
+    deps = set()
+    _local.deps = deps
+    try:
+        yield deps
+    finally:
+        _local.deps = None
+
+def record_dependency(path):
+    deps = getattr(_local, 'deps', None)
+    if deps is not None:
+        deps.add(os.path.abspath(path))
+
+def markdown_instance():
+    md = getattr(_local, 'md', None)
+    if md is None:
+        import markdown
+        md = _local.md = markdown.Markdown(extensions=MD_EXTENSIONS)
+    return md.reset()
+
+def is_path(text):
+    return '\n' not in text and len(text) < 4096 and os.path.isfile(text)
+
+
+class MarkdownCache(object):
+    config = json.dumps(MD_EXTENSIONS)
+
+    def __init__(self, path=None, size=1024, disk_size=DISK_SIZE):
+        self.path = path
+        self.size = size
+        self.disk_size = disk_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def key(self, text):
+        text = self.config + '\0' + text
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + '.html')
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.path:
+            path = self._file(key)
+            try:
+                with open(path, 'r') as f:
+                    html = f.read()
+                os.utime(path, (time.time(), os.stat(path).st_mtime))
+            except OSError:
+                return None
+            self._store(key, html)
+            return html
+        return None
+
+    def set(self, key, html):
+        self._store(key, html)
+        if self.path:
+            path = self._file(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = '{}.{}.tmp'.format(path, os.getpid())
+            with open(tmp, 'w') as f:
+                f.write(html)
+            os.replace(tmp, path)
+
+    def _store(self, key, html):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def convert(self, text):
+        label = '<inline>'
+        if is_path(text):
+            label = text
+            record_dependency(text)
+            st = os.stat(text)
+            stamp = (st.st_mtime_ns, st.st_size)
+            known = self._files.get(text)
+            if known and known[0] == stamp:
+                html = self.get(known[1])
+                if html is not None:
+                    self.hits += 1
+                    return html
+            path = text
+            with open(path, 'r') as f:
+                text = f.read()
+            key = self.key(text)
+            self._files[path] = (stamp, key)
+        else:
+            key = self.key(text)
+        html = self.get(key)
+        if html is not None:
+            self.hits += 1
+            return html
+        self.misses += 1
+        with span('markdown', label):
+            html = markdown_instance().convert(text).strip()
+        self.set(key, html)
+        return html
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+    def trim(self):
+        if not self.path:
+            return 0
+        entries, total = [], 0
+        for dirpath, dirs, names in os.walk(self.path):
+            for name in names:
+                if not name.endswith('.html'):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_atime, path, st.st_size))
+                total += st.st_size
+        entries.sort()
+        removed = 0
+        for _, path, size in entries:
+            if total <= self.disk_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            log.info("Markdown cache: evicted %d entries", removed)
+        return removed
+
+
+markdown_cache = MarkdownCache()
+
 def markdown_filter(text):
-    md = markdown.Markdown(extensions=MD_EXTENSIONS)
-    if os.path.exists(text):
-        with open(text, 'r') as f:
-            text = f.read()
-    return md.convert(text).strip()
+    return markdown_cache.convert(text)
 
 def markdown_toc(text):
-    md = markdown.Markdown(extensions=MD_EXTENSIONS)
+    md = markdown_instance()
     md.convert(text)
     return md.toc.strip()
 
 
+class BytecodeCache(jinja2.FileSystemBytecodeCache):
+    def dump_bytecode(self, bucket):
+        os.makedirs(self.directory, exist_ok=True)
+        super().dump_bytecode(bucket)
+
+
 class Template(object):
-    def __init__(self, app):
-        self.env = jinja2.Environment(loader=jinja2.FileSystemLoader(str(app.path.template)))
+    def __init__(self, app, cache=None):
+        self.cache = cache
+        self.markdown = MarkdownCache(cache and os.path.join(str(cache), 'markdown'))
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(app.path.template)),
+            bytecode_cache=cache and BytecodeCache(os.path.join(str(cache), 'jinja'))
+        )
         self.env.globals.update({
-            'app': app
+            'app': app,
+            'asset': app.asset,
         })
         self.env.filters.update({
-            'markdown': markdown_filter
+            'markdown': self.markdown.convert
         })
+        self._compiled = LRUCache(256)
+        self._dependencies = {}
+        self._names = None
+
+    def reset(self):
+        self._dependencies.clear()
+        self._names = None
+        self.markdown.reset()
+
+    def invalidate(self, changed):
+        changed = set(map(os.path.abspath, changed))
+        for template, deps in list(self._dependencies.items()):
+            if deps & changed:
+                del self._dependencies[template]
+        if self._names is not None:
+            for root in map(os.path.abspath, self.env.loader.searchpath):
+                for path in changed:
+                    if not path.startswith(root + os.sep):
+                        continue
+                    name = os.path.relpath(path, root).replace(os.sep, '/')
+                    if os.path.exists(path) != (name in self._names):
+                        self._names = None
+                        break
+        self.markdown.reset()
+
+    def adopt(self, other):
+        self.env.filters.update((name, value) for name, value in other.env.filters.items()
+                                if name != 'markdown')
+        self.env.tests.update(other.env.tests)
+        self.env.globals.update((name, value) for name, value in other.env.globals.items()
+                                if name not in ('app', 'asset'))
+
+    def exists(self, name):
+        if self._names is None:
+            self._names = set(self.env.list_templates())
+        return name in self._names
+
+    def from_string(self, source):
+        key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        template = self._compiled.get(key)
+        if template is None:
+            template = self._compiled[key] = self.env.from_string(source)
+        return template
+
+    def dependencies(self, template):
+        if template in self._dependencies:
+            return self._dependencies[template]
+        if self.exists(template):
+            source, filename, _ = self.env.loader.get_source(self.env, template)
+            deps = {os.path.abspath(filename)}
+        else:
+            source, deps = template, set()
+        self._dependencies[template] = deps
+        for name in meta.find_referenced_templates(self.env.parse(source)):
+            if name is not None:
+                deps |= self.dependencies(name)
+        return deps
+
+    def compile(self):
+        names = self.env.list_templates()
+        for name in names:
+            self.env.get_template(name)
+        return names
+
+    def load(self, template):
+        label = template if self.exists(template) else '<string>'
+        with span('template', label):
+            if label == template:
+                return self.env.get_template(template), label
+            return self.from_string(template), label
 
     def render(self, template, **data):
-        try:
-            template = self.env.get_template(template)
-        except TemplateNotFound:
-            template = self.env.from_string(template)
-        return template.render(**data)
+        template, label = self.load(template)
+        with span('render', label):
+            return template.render(**data)
+
+    def generate(self, template, **data):
+        template, label = self.load(template)
+        chunks = template.generate(**data)
+        while True:
+            with span('render', label):
+                buffer, size = [], 0
+                for chunk in chunks:
+                    buffer.append(chunk)
+                    size += len(chunk)
+                    if size >= CHUNK_SIZE:
+                        break
+            if not buffer:
+                return
+            yield ''.join(buffer)
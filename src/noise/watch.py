@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+__author__    = "Ryon Sherman"
+__email__     = "ryon.sherman@gmail.com"
+__copyright__ = "Copyright 2014-2026, Ryon Sherman"
+__license__   = "MIT"
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+log = logging.getLogger("noise")
+
+IGNORE = ('build', 'shards', '.git', '__pycache__', '.gradle', '.noise-cache')
+
+IN_MODIFY      = 0x00000002
+IN_ATTRIB      = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = getattr(os, 'O_NONBLOCK', 0o4000)
+IN_CLOEXEC     = 0o2000000
+
+IN_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+           IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+EVENT = struct.Struct('iIII')
+
+
+class Watcher(object):
+    def __init__(self, root, callback, ignore=IGNORE, delay=0.1):
+        self.root = str(root)
+        self.callback = callback
+        self.ignore = tuple(ignore)
+        self.delay = delay
+
+    def start(self):
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def walk(self, root=None):
+        for root, dirs, files in os.walk(root or self.root):
+            dirs[:] = [d for d in dirs if d not in self.ignore]
+            yield root, files
+
+    def ignored(self, path):
+        parts = os.path.relpath(path, self.root).split(os.sep)
+        return any(part in self.ignore for part in parts)
+
+    def notify(self, changed):
+        try:
+            self.callback(sorted(changed))
+        except Exception:
+            log.exception("Watch callback failed")
+
+
+class PollingWatcher(Watcher):
+    def __init__(self, root, callback, ignore=IGNORE, delay=1):
+        Watcher.__init__(self, root, callback, ignore, delay)
+        self.mtimes = self.scan()
+
+    def scan(self):
+        mtimes = {}
+        try:
+            for root, files in self.walk():
+                for f in files:
+                    path = os.path.join(root, f)
+                    try:
+                        mtimes[path] = os.stat(path).st_mtime
+                    except OSError:
+                        continue
+        except OSError as e:
+            log.error("Watch error walking source tree: %s", e)
+        return mtimes
+
+    def run(self):
+        while True:
+            time.sleep(self.delay)
+            mtimes = self.scan()
+            changed = {p for p, m in mtimes.items() if self.mtimes.get(p) != m}
+            changed |= set(self.mtimes) - set(mtimes)
+            self.mtimes = mtimes
+            if changed:
+                self.notify(changed)
+
+
+class InotifyWatcher(Watcher):
+    def __init__(self, root, callback, ignore=IGNORE, delay=0.1):
+        Watcher.__init__(self, root, callback, ignore, delay)
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        for root, files in self.walk():
+            self.add(root)
+
+    def add(self, path):
+        wd = self._add_watch(self.fd, os.fsencode(path), IN_MASK)
+        if wd < 0:
+            log.warning("Unable to watch %s: %s", path, os.strerror(ctypes.get_errno()))
+            return
+        self.watches[wd] = path
+
+    def remove(self, path):
+        for wd, root in list(self.watches.items()):
+            if root == path or root.startswith(path + os.sep):
+                self._rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def read(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                log.warning("Watch queue overflowed, rescanning")
+                changed.add(self.root)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            root = self.watches.get(wd)
+            if root is None:
+                continue
+            path = os.path.join(root, name) if name else root
+            if self.ignored(path):
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    for subdir, files in self.walk(path):
+                        self.add(subdir)
+                        changed.update(os.path.join(subdir, f) for f in files)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.remove(path)
+                    changed.add(path)
+                continue
+            changed.add(path)
+        return changed
+
+    def run(self):
+        pending = set()
+        while True:
+            timeout = self.delay if pending else None
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if ready:
+                pending |= self.read()
+            elif pending:
+                self.notify(pending)
+                pending = set()
+
+
+def watcher(root, callback, ignore=IGNORE):
+    try:
+        return InotifyWatcher(root, callback, ignore)
+    except (OSError, AttributeError, TypeError) as e:
+        log.debug("inotify unavailable (%s), polling for changes", e)
+        return PollingWatcher(root, callback, ignore)
@@ -0,0 +1,60 @@
+import asyncio
+import shutil
+import tempfile
+from functools import partial
+
+import pytest
+
+from noise import Noise
+from noise.aio import is_async, prepare
+from noise.page import Page
+
+
+async def _load(state, page, delay=0.01):
+    state["active"] += 1
+    state["peak"] = max(state["peak"], state["active"])
+    await asyncio.sleep(delay)
+    state["active"] -= 1
+    page.data["title"] = page.route
+
+
+class TestPrepare:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = Noise(self.tmpdir)
+        self.state = {"active": 0, "peak": 0}
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_detects_async_callbacks(self):
+        assert is_async(_load)
+        assert is_async(partial(_load, {}))
+        assert not is_async(lambda page: None)
+
+    def test_awaits_callbacks_concurrently(self):
+        callback = partial(_load, self.state)
+        pages = [("/{}.html".format(i), callback) for i in range(7)]
+        results = list(prepare(self.app, pages, 3))
+        assert self.state["peak"] == 3
+        assert sorted(route for route, _ in results) == sorted(route for route, _ in pages)
+        for route, page in results:
+            assert type(page) is Page
+            assert page.data["title"] == route
+
+    def test_yields_completed_pages_first(self):
+        slow = partial(_load, self.state, delay=0.05)
+        fast = partial(_load, self.state, delay=0)
+        routes = [route for route, _ in prepare(self.app, [("/slow", slow), ("/fast", fast)])]
+        assert routes == ["/fast", "/slow"]
+
+    def test_passes_sync_callbacks_through(self):
+        def sync(page):
+            pass
+        assert list(prepare(self.app, [("/a", sync)])) == [("/a", sync)]
+
+    def test_raises_callback_errors(self):
+        async def broken(page):
+            raise RuntimeError("boom")
+        with pytest.raises(RuntimeError, match="boom"):
+            list(prepare(self.app, [("/a", broken)]))
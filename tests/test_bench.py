@@ -0,0 +1,44 @@
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from bench import compare, generate
+
+
+class TestGenerate:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_generates_buildable_project(self):
+        from noise import load_project
+        generate(self.tmpdir, routes=3, depth=2, markdown_size=256, static_files=2, static_size=64)
+        app = load_project(self.tmpdir).app
+        assert len(app.routes) == 3
+        app.build()
+        with open(os.path.join(self.tmpdir, "build", "posts", "post000000", "index.html")) as f:
+            html = f.read()
+        assert '<div class="level1">' in html
+        assert "<h1" in html
+        assert os.path.exists(os.path.join(self.tmpdir, "build", "css", "style00000.css"))
+
+    def test_is_reproducible(self):
+        a, b = os.path.join(self.tmpdir, "a"), os.path.join(self.tmpdir, "b")
+        generate(a, routes=2, static_files=0, seed=7)
+        generate(b, routes=2, static_files=0, seed=7)
+        for name in ("post000000.md", "post000001.md"):
+            with open(os.path.join(a, "content", name)) as f, open(os.path.join(b, "content", name)) as g:
+                assert f.read() == g.read()
+
+
+class TestCompare:
+    def test_flags_regressions(self):
+        baseline = {"results": {"cold_build": {"seconds": 1.0, "rss_kb": 100}}}
+        current = {"results": {"cold_build": {"seconds": 1.2, "rss_kb": 105}}}
+        assert compare(baseline, current, 0.1) == [("cold_build", "seconds", 1.0, 1.2)]
+        assert compare(baseline, current, 0.25) == []
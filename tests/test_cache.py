@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+
+from noise.cache import RenderCache
+from noise.manifest import hash_file
+
+
+class TestRenderCache:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmpdir, "project")
+        os.makedirs(self.root)
+        self.cache = RenderCache(os.path.join(self.tmpdir, "cache"), root=self.root)
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_key_combines_parts(self):
+        assert self.cache.key("a", "b") == self.cache.key("a", "b")
+        assert self.cache.key("a", "b") != self.cache.key("ab")
+
+    def test_stores_and_places_outputs(self):
+        dep = self.write("post.md", "# Post")
+        output = self.write("build/index.html", "<h1>Post</h1>")
+        self.cache.set("ab12", output, {dep}, hash_file)
+        with open(os.path.join(self.tmpdir, "cache", "ab", "ab12.json")) as f:
+            assert "post.md" in f.read()
+
+        target = os.path.join(self.tmpdir, "other", "index.html")
+        assert self.cache.get("ab12", target, hash_file) == {dep}
+        with open(target) as f:
+            assert f.read() == "<h1>Post</h1>"
+        assert self.cache.hits == 1
+
+    def test_miss_when_dependency_changes(self):
+        dep = self.write("post.md", "# Post")
+        output = self.write("build/index.html", "<h1>Post</h1>")
+        self.cache.set("ab12", output, {dep}, hash_file)
+        self.write("post.md", "# Changed")
+        assert self.cache.get("ab12", output, hash_file) is None
+        assert self.cache.get("cd34", output, hash_file) is None
+        assert self.cache.misses == 2
+
+    def test_trim_evicts_least_recently_used(self):
+        for key in ("aa01", "bb02", "cc03"):
+            output = self.write("build/{}.html".format(key), "x" * 100)
+            self.cache.set(key, output, set(), hash_file)
+            path = os.path.join(self.tmpdir, "cache", key[:2], key)
+            os.utime(path, ({"aa01": 3, "bb02": 1, "cc03": 2}[key], 0))
+        self.cache.size = 200
+        assert self.cache.trim() == 1
+        assert not os.path.exists(os.path.join(self.tmpdir, "cache", "bb", "bb02"))
+        assert not os.path.exists(os.path.join(self.tmpdir, "cache", "bb", "bb02.json"))
+        assert os.path.exists(os.path.join(self.tmpdir, "cache", "aa", "aa01"))
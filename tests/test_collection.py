@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+
+from noise import Noise
+from noise.collection import front_matter, parse_value
+from noise.template import track_dependencies
+
+
+POSTS = {
+    "first.md": "---\ntitle: First\ndate: 2024-01-01\ntags: [python, web]\n---\n# First\n",
+    "second.md": "---\ntitle: \"Second\"\ndate: 2024-02-01\ntags: [web]\ndraft: true\n---\n# Second\n",
+    "third.md": "---\ntitle: Third\ndate: 2024-03-01\n---\n# Third\n",
+    "plain.md": "# No front matter\n",
+}
+
+
+class TestFrontMatter:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_parses_values(self):
+        assert parse_value("3") == 3
+        assert parse_value("true") is True
+        assert parse_value("\"quoted\"") == "quoted"
+        assert parse_value("2024-01-01") == "2024-01-01"
+        assert parse_value("[a, 2]") == ["a", 2]
+
+    def test_returns_body_offset(self):
+        path = os.path.join(self.tmpdir, "post.md")
+        with open(path, "w") as f:
+            f.write(POSTS["first.md"])
+        meta, offset = front_matter(path)
+        assert meta == {"title": "First", "date": "2024-01-01", "tags": ["python", "web"]}
+        with open(path) as f:
+            assert f.read()[offset:] == "# First\n"
+
+    def test_missing_front_matter(self):
+        path = os.path.join(self.tmpdir, "post.md")
+        with open(path, "w") as f:
+            f.write(POSTS["plain.md"])
+        assert front_matter(path) == ({}, 0)
+
+
+class TestCollection:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmpdir, "posts"))
+        for name, content in POSTS.items():
+            with open(os.path.join(self.tmpdir, "posts", name), "w") as f:
+                f.write(content)
+        self.app = Noise(self.tmpdir)
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_collection_is_shared(self):
+        assert self.app.collection("posts/*.md") is self.app.collection("posts/*.md")
+
+    def test_sort_filter_paginate(self):
+        posts = self.app.collection("posts/*.md")
+        assert len(posts) == 4
+        ordered = posts.filter(lambda post: "title" in post.meta).sort("date", reverse=True)
+        assert [post.title for post in ordered] == ["Third", "Second", "First"]
+        assert [post.name for post in posts.filter(tags="web")] == ["first", "second"]
+        assert [post.name for post in posts.filter(draft=True)] == ["second"]
+        pages = ordered.paginate(2)
+        assert [len(page) for page in pages] == [2, 1]
+        assert pages[1][0].title == "First"
+        assert posts.get("third")["date"] == "2024-03-01"
+
+    def test_body_is_loaded_on_access(self):
+        post = self.app.collection("posts/*.md").get("first")
+        with track_dependencies() as deps:
+            assert post.body == "# First\n"
+        assert deps == {post.path}
+
+    def test_matches_changed_files(self):
+        posts = self.app.collection("posts/*.md")
+        assert posts.matches(os.path.join(self.tmpdir, "posts", "new.md"))
+        assert not posts.matches(os.path.join(self.tmpdir, "template", "index.html"))
+        nested = self.app.collection("posts/**/*.md")
+        assert nested.matches(os.path.join(self.tmpdir, "posts", "first.md"))
+        assert nested.matches(os.path.join(self.tmpdir, "posts", "2024", "new.md"))
+
+    def test_index_is_cached_on_disk(self):
+        posts = self.app.collection("posts/*.md")
+        posts.entries
+        with open(posts.index_path) as f:
+            index = json.load(f)
+        assert index[os.path.join("posts", "first.md")][1]["title"] == "First"
+
+        with open(os.path.join(self.tmpdir, "posts", "first.md"), "w") as f:
+            f.write("---\ntitle: Updated\n---\nBody\n")
+        posts.reset()
+        assert posts.get("first").title == "Updated"
+        assert posts.get("first").body == "Body\n"
+
+    def test_repr_changes_with_metadata(self):
+        posts = self.app.collection("posts/*.md")
+        before = repr(posts)
+        with open(os.path.join(self.tmpdir, "posts", "fourth.md"), "w") as f:
+            f.write("---\ntitle: Fourth\n---\n")
+        posts.reset()
+        assert repr(posts) != before
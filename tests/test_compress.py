@@ -0,0 +1,72 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from noise.compress import accepted, compress, compress_tree, compressible, negotiate
+
+
+class TestCompress:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_compressible_types(self):
+        assert compressible("site.css")
+        assert compressible("index.html")
+        assert compressible("app.js")
+        assert not compressible("photo.jpg")
+        assert not compressible("site.css.gz")
+
+    def test_writes_gzip_sibling(self):
+        data = b"body { color: red; }\n" * 200
+        path = self._write("site.css", data)
+        assert compress(path) > 0
+        with gzip.open(path + ".gz") as f:
+            assert f.read() == data
+
+    def test_skips_small_files(self):
+        path = self._write("small.css", b"a{}")
+        assert compress(path) == 0
+        assert not os.path.exists(path + ".gz")
+
+    def test_skips_incompressible_output(self):
+        path = self._write("random.txt", os.urandom(4096))
+        assert compress(path) == 0
+        assert not os.path.exists(path + ".gz")
+
+    def test_tree_skips_fresh_siblings(self):
+        path = self._write("site.css", b"body {}\n" * 500)
+        assert compress_tree(self.tmpdir) > 0
+        assert compress_tree(self.tmpdir) == 0
+        assert not os.path.exists(path + ".gz.gz")
+
+    def test_replaced_source_with_older_mtime(self):
+        path = self._write("index.html", b"<p>new</p>\n" * 500)
+        compress(path)
+        older = self._write("old.html", b"<p>old</p>\n" * 500)
+        os.utime(older, ns=(0, os.stat(path).st_mtime_ns - 10 ** 9))
+        os.replace(older, path)
+        assert compress(path) > 0
+        with gzip.open(path + ".gz") as f:
+            assert f.read().startswith(b"<p>old</p>")
+        assert compress(path) == 0
+
+    def test_negotiate(self):
+        path = self._write("site.css", b"body {}\n" * 500)
+        assert negotiate(path, "gzip") == (None, path)
+        compress(path)
+        assert negotiate(path, "gzip, deflate") == ("gzip", path + ".gz")
+        assert negotiate(path, "gzip;q=0") == (None, path)
+        assert negotiate(path, None) == (None, path)
+
+    def test_accepted(self):
+        assert accepted("gzip, br;q=0.5, zstd;q=0") == {"gzip", "br"}
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import tempfile
+
+from noise import fingerprint
+from noise.fingerprint import Assets, fingerprinted
+from noise.template import track_dependencies
+
+
+class TestAssets:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmpdir, "static")
+        self.write("img/logo.png", "png")
+        self.write("css/site.css", "body { background: url(../img/logo.png) }")
+        self.write("robots.txt", "User-agent: *")
+        self.assets = Assets(os.path.join(self.tmpdir, "cache", "assets.json"))
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.static, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_fingerprinted(self):
+        assert fingerprinted("css/site.css", "0123456789abcdef") == "css/site.01234567.css"
+
+    def test_scan_names_assets(self):
+        names = self.assets.scan(self.static)
+        assert sorted(names) == ["css/site.css", "img/logo.png"]
+        logo = names["img/logo.png"]
+        assert logo.startswith("img/logo.") and logo.endswith(".png")
+        assert self.assets.styles["css/site.css"] == \
+            "body { background: url(../img/" + os.path.basename(logo) + ") }"
+
+    def test_style_hash_follows_references(self):
+        before = self.assets.scan(self.static)["css/site.css"]
+        self.write("img/logo.png", "new png")
+        assert self.assets.scan(self.static)["css/site.css"] != before
+
+    def test_skips_rehashing_unchanged_files(self, monkeypatch):
+        self.assets.scan(self.static)
+        hashed = []
+        monkeypatch.setattr(fingerprint, "hash_file", lambda path: hashed.append(path) or "0" * 40)
+        Assets(self.assets.path).scan(self.static)
+        assert hashed == []
+        self.write("img/logo.png", "changed")
+        Assets(self.assets.path).scan(self.static)
+        assert hashed == [os.path.join(self.static, "img", "logo.png")]
+
+    def test_write_outputs_styles_and_manifest(self):
+        names = self.assets.scan(self.static)
+        target = os.path.join(self.tmpdir, "build")
+        routes = self.assets.write(target)
+        assert sorted(routes) == sorted(["/assets.json", "/" + names["css/site.css"]])
+        with open(os.path.join(target, "assets.json")) as f:
+            assert json.load(f) == names
+
+    def test_rewrite_references(self):
+        names = self.assets.scan(self.static)
+        logo = os.path.basename(names["img/logo.png"])
+        html = ('<img src="/img/logo.png?v=1"><img src=\'../img/logo.png\'>'
+                '<a href="https://example.com/img/logo.png"></a><a href="/robots.txt"></a>')
+        with track_dependencies() as deps:
+            result = self.assets.rewrite(html, "blog")
+        assert result == ('<img src="/img/{0}?v=1"><img src=\'../img/{0}\'>'
+                          '<a href="https://example.com/img/logo.png"></a>'
+                          '<a href="/robots.txt"></a>').format(logo)
+        assert deps == {os.path.join(self.static, "img", "logo.png")}
+
+    def test_stream_does_not_split_references(self):
+        names = self.assets.scan(self.static)
+        chunks = ['<p>a</p><img sr', 'c="/img/lo', 'go.png">', '<p>b</p>']
+        result = "".join(self.assets.stream(iter(chunks)))
+        assert result == '<p>a</p><img src="/{}"><p>b</p>'.format(names["img/logo.png"])
+
+    def test_url(self):
+        names = self.assets.scan(self.static)
+        assert self.assets.url("/img/logo.png") == "/" + names["img/logo.png"]
+        assert self.assets.url("robots.txt") == "/robots.txt"
@@ -0,0 +1,46 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+BUDGET_US = 150000
+DEFERRED = ("jinja2", "markdown", "ctypes", "noise.template", "noise.compress", "noise.static")
+
+
+def import_times(code):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            env=env, cwd=SRC, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue
+    return times
+
+
+def test_import_defers_heavy_modules():
+    times = import_times("import noise")
+    assert "noise" in times
+    assert not [name for name in times if name.split(".")[0] in DEFERRED or name in DEFERRED]
+
+
+def test_import_time_budget():
+    times = min((import_times("import noise") for _ in range(3)), key=lambda t: t["noise"])
+    assert times["noise"] < BUDGET_US
+
+
+def test_init_does_not_load_templates():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        import_times("import sys; from noise import Noise; Noise({!r}).init(); "
+                     "assert 'jinja2' not in sys.modules".format(tmpdir))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
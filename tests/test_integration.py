@@ -1,3 +1,4 @@
+import asyncio
 import os
 import shutil
 import sys
@@ -73,3 +74,685 @@ def test_static_files_copied(project_dir):
 
     n.build()
     assert os.path.exists(os.path.join(project_dir, "build", "css", "style.css"))
+
+
+def test_static_sync_removes_deleted_files(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    for name in ("keep.css", "gone.css"):
+        with open(os.path.join(project_dir, "static", name), "w") as f:
+            f.write(name)
+    n.build()
+    keep = os.path.join(project_dir, "build", "keep.css")
+    inode = os.stat(keep).st_ino
+
+    os.remove(os.path.join(project_dir, "static", "gone.css"))
+    n.build()
+    assert os.stat(keep).st_ino == inode
+    assert not os.path.exists(os.path.join(project_dir, "build", "gone.css"))
+
+
+def test_incremental_build_skips_unchanged(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    with open(os.path.join(project_dir, "template", "base.html"), "w") as f:
+        f.write("<body>{% block body %}{% endblock %}</body>")
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write("{% extends 'base.html' %}{% block body %}{{ title }}{% endblock %}")
+
+    @n.route("/")
+    def index(page):
+        page.data["title"] = "Home"
+
+    @n.route("/about")
+    def about(page):
+        page.data["title"] = "About"
+        page.data["body"] = "About us"
+
+    n.build()
+    index_path = os.path.join(project_dir, "build", "index.html")
+    about_path = os.path.join(project_dir, "build", "about.html")
+    os.utime(index_path, (0, 0))
+    os.utime(about_path, (0, 0))
+
+    n.build(incremental=True)
+    assert os.path.getmtime(index_path) == 0
+    assert os.path.getmtime(about_path) == 0
+
+    with open(os.path.join(project_dir, "template", "base.html"), "w") as f:
+        f.write("<main>{% block body %}{% endblock %}</main>")
+    n.build(incremental=True)
+    assert os.path.getmtime(index_path) != 0
+    assert os.path.getmtime(about_path) == 0
+    with open(index_path) as f:
+        assert f.read() == "<main>Home</main>"
+
+
+def test_incremental_build_tracks_markdown(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    post = os.path.join(project_dir, "post.md")
+    with open(post, "w") as f:
+        f.write("# First")
+
+    @n.route("/")
+    def index(page):
+        page.data["post"] = post
+
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write("{{ post|markdown }}")
+
+    n.build(incremental=True)
+    index_path = os.path.join(project_dir, "build", "index.html")
+    os.utime(index_path, (0, 0))
+    n.build(incremental=True)
+    assert os.path.getmtime(index_path) == 0
+
+    with open(post, "w") as f:
+        f.write("# Second")
+    n.build(incremental=True)
+    with open(index_path) as f:
+        assert "Second" in f.read()
+
+
+def test_incremental_build_removes_stale_routes(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    @n.route("/old")
+    def old(page):
+        page.data["title"] = "Old"
+
+    n.build()
+    old_path = os.path.join(project_dir, "build", "old.html")
+    assert os.path.exists(old_path)
+
+    del n.routes["/old.html"]
+    n.build(incremental=True)
+    assert not os.path.exists(old_path)
+
+
+def _parallel_page(page):
+    page.data["title"] = page.route
+    page.data["body"] = "Parallel"
+
+
+def test_parallel_build(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    for i in range(8):
+        n.route("/page{}".format(i))(_parallel_page)
+    n.route("/closure")(lambda page: page.data.update(title="Closure"))
+
+    n.build(jobs=3)
+    for i in range(8):
+        with open(os.path.join(project_dir, "build", "page{}.html".format(i))) as f:
+            assert "<title>/page{}.html</title>".format(i) in f.read()
+    with open(os.path.join(project_dir, "build", "closure.html")) as f:
+        assert "<title>Closure</title>" in f.read()
+
+    from noise.manifest import Manifest
+    manifest = Manifest(os.path.join(project_dir, ".noise-cache", "manifest.json")).load()
+    assert sorted(manifest.entries) == sorted(n.routes)
+
+
+def test_update_rebuilds_affected_routes(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    template = os.path.join(project_dir, "template", "index.html")
+    with open(template, "w") as f:
+        f.write("one")
+    css = os.path.join(project_dir, "static", "site.css")
+    with open(css, "w") as f:
+        f.write("body {}")
+
+    @n.route("/")
+    def index(page):
+        pass
+
+    @n.route("/about")
+    def about(page):
+        page.data["title"] = "About"
+
+    n.build()
+    with open(template, "w") as f:
+        f.write("two")
+    with open(css, "w") as f:
+        f.write("main {}")
+
+    assert n.update([template, css]) == ["/site.css", "/index.html"]
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert f.read() == "two"
+    with open(os.path.join(project_dir, "build", "site.css")) as f:
+        assert f.read() == "main {}"
+    assert n.update([template, css]) == []
+
+    about_template = os.path.join(project_dir, "template", "about.html")
+    with open(about_template, "w") as f:
+        f.write("{{ title }}")
+    assert n.update([about_template]) == ["/about.html"]
+    with open(os.path.join(project_dir, "build", "about.html")) as f:
+        assert f.read() == "About"
+
+
+def test_atomic_build_keeps_unchanged_files(project_dir):
+    import json
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    with open(os.path.join(project_dir, "static", "site.css"), "w") as f:
+        f.write("body {}")
+    with open(os.path.join(project_dir, "static", "old.css"), "w") as f:
+        f.write("main {}")
+
+    titles = {"/index.html": "Home", "/about.html": "About"}
+
+    def titled(page):
+        page.data["title"] = titles[page.route]
+
+    for route in titles:
+        n.route(route)(titled)
+
+    n.build(atomic=True)
+    build = os.path.join(project_dir, "build")
+    index, about = os.path.join(build, "index.html"), os.path.join(build, "about.html")
+    inode = os.stat(index).st_ino
+    os.utime(index, (0, 0))
+
+    titles["/about.html"] = "About us"
+    os.remove(os.path.join(project_dir, "static", "old.css"))
+    with open(os.path.join(project_dir, "static", "new.css"), "w") as f:
+        f.write("nav {}")
+    n.build(atomic=True)
+
+    assert os.stat(index).st_ino == inode
+    assert os.path.getmtime(index) == 0
+    with open(about) as f:
+        assert "About us" in f.read()
+    assert not os.path.exists(os.path.join(build, "old.css"))
+    assert not os.path.exists(os.path.join(project_dir, ".build-stage"))
+
+    with open(os.path.join(project_dir, ".noise-cache", "changes.json")) as f:
+        changes = json.load(f)
+    assert changes == {"added": ["/new.css"], "changed": ["/about.html"], "removed": ["/old.css"]}
+
+
+def test_profile_build(project_dir):
+    import json
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    post = os.path.join(project_dir, "post.md")
+    with open(post, "w") as f:
+        f.write("# Post")
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write("{{ post|markdown }}")
+
+    @n.route("/")
+    def index(page):
+        page.data["post"] = post
+
+    seen = []
+    n.pre_render(lambda route: seen.append(("pre", route)))
+    n.post_render(lambda route, path, stats: seen.append(("post", route, sorted(stats))))
+
+    n.build(profile=True)
+    assert seen[0] == ("pre", "/index.html")
+    assert seen[1][:2] == ("post", "/index.html")
+    assert {"callback", "template", "render", "markdown", "write", "total"} <= set(seen[1][2])
+
+    with open(os.path.join(project_dir, ".noise-cache", "profile.json")) as f:
+        report = json.load(f)
+    assert report["routes"]["/index.html"]["total"] > 0
+    assert "index.html" in report["templates"]
+    assert post in report["markdown"]
+    assert n.profiler is None
+
+
+def test_parallel_build_keeps_custom_filters(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+    n.template.env.filters["shout"] = lambda text: text.upper() + "!"
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write("{{ title|shout }}")
+    for i in range(4):
+        n.route("/page{}".format(i))(_parallel_page)
+    n.route("/")(_parallel_page)
+
+    assert len(n.build(jobs=2)) == 5
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert f.read() == "/INDEX.HTML!"
+
+
+def test_post_render_runs_in_parent_with_jobs(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+    for i in range(8):
+        n.route("/page{}".format(i))(_parallel_page)
+
+    seen = []
+    n.post_render(lambda route, path, stats: seen.append((route, os.getpid(), "total" in stats)))
+    n.build(jobs=4)
+    assert sorted(route for route, _, _ in seen) == sorted(n.routes)
+    assert {(pid, total) for _, pid, total in seen} == {(os.getpid(), True)}
+
+
+def _item_page(page, slug):
+    page.data["title"] = slug
+    page.data["body"] = "Item"
+
+
+def test_parameterized_routes(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    slugs = ["a", "b", "c"]
+    n.route("/items/<slug>/", params=lambda: ({"slug": slug} for slug in slugs))(_item_page)
+
+    assert n.build() == ["/items/a/index.html", "/items/b/index.html", "/items/c/index.html"]
+    with open(os.path.join(project_dir, "build", "items", "b", "index.html")) as f:
+        assert "<title>b</title>" in f.read()
+    assert n.build(incremental=True) == []
+
+    page, deps = n.render("/items/c/index.html")
+    assert page.data["title"] == "c"
+    with pytest.raises(KeyError):
+        n.render("/items/d/index.html")
+
+    slugs[:] = ["a", "d"]
+    built = n.build(incremental=True, jobs=2)
+    assert sorted(built) == ["/items/b/index.html", "/items/c/index.html", "/items/d/index.html"]
+    assert not os.path.exists(os.path.join(project_dir, "build", "items", "b"))
+    assert os.path.exists(os.path.join(project_dir, "build", "items", "d", "index.html"))
+
+
+def test_collection_pages(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    os.makedirs(os.path.join(project_dir, "posts"))
+    for name, title in (("a", "Alpha"), ("b", "Beta")):
+        with open(os.path.join(project_dir, "posts", name + ".md"), "w") as f:
+            f.write("---\ntitle: {}\n---\n# {}\n".format(title, title))
+    with open(os.path.join(project_dir, "template", "post.html"), "w") as f:
+        f.write("{{ post.body|markdown }}")
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write("{% for post in posts %}{{ post.title }};{% endfor %}")
+
+    posts = n.collection("posts/*.md")
+
+    @n.route("/")
+    def index(page):
+        page.data["posts"] = posts.sort("title")
+
+    @n.route("/<name>/", params=lambda: ({"name": post.name} for post in posts))
+    def post(page, name):
+        page.template = os.path.join(project_dir, "template", "post.html")
+        page.data["post"] = posts.get(name)
+
+    n.build()
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert f.read() == "Alpha;Beta;"
+    with open(os.path.join(project_dir, "build", "b", "index.html")) as f:
+        assert "<h1" in f.read()
+    assert n.build(incremental=True) == []
+
+    with open(os.path.join(project_dir, "posts", "b.md"), "w") as f:
+        f.write("---\ntitle: Gamma\n---\n# Gamma\n")
+    assert sorted(n.build(incremental=True)) == ["/b/index.html", "/index.html"]
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert f.read() == "Alpha;Gamma;"
+
+    c = os.path.join(project_dir, "posts", "c.md")
+    with open(c, "w") as f:
+        f.write("---\ntitle: Delta\n---\n# Delta\n")
+    assert sorted(n.update([c])) == ["/c/index.html", "/index.html"]
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert f.read() == "Alpha;Delta;Gamma;"
+
+    a = os.path.join(project_dir, "posts", "a.md")
+    os.remove(a)
+    assert sorted(n.update([a])) == ["/a/index.html", "/index.html"]
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert f.read() == "Delta;Gamma;"
+    assert not os.path.exists(os.path.join(project_dir, "build", "a"))
+
+
+def test_fingerprint_build(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    os.makedirs(os.path.join(project_dir, "static", "css"))
+    with open(os.path.join(project_dir, "static", "css", "site.css"), "w") as f:
+        f.write("body { color: red }")
+    with open(os.path.join(project_dir, "static", "app.js"), "w") as f:
+        f.write("console.log(1)")
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write('<link href="{{ asset(\'css/site.css\') }}"><script src="app.js"></script>')
+
+    @n.route("/")
+    def index(page):
+        pass
+
+    n.build(fingerprint=True)
+    build = os.path.join(project_dir, "build")
+    names = n.assets.names
+    with open(os.path.join(build, "index.html")) as f:
+        assert f.read() == '<link href="/{}"><script src="{}"></script>'.format(
+            names["css/site.css"], names["app.js"])
+    assert os.path.exists(os.path.join(build, names["css/site.css"]))
+    assert os.path.exists(os.path.join(build, names["app.js"]))
+    assert not os.path.exists(os.path.join(build, "app.js"))
+    assert not os.path.exists(os.path.join(build, "css", "site.css"))
+    assert n.build(incremental=True, fingerprint=True) == []
+
+    old = names["app.js"]
+    with open(os.path.join(project_dir, "static", "app.js"), "w") as f:
+        f.write("console.log(2)")
+    assert n.build(incremental=True, fingerprint=True) == ["/index.html"]
+    assert not os.path.exists(os.path.join(build, old))
+
+    assert n.build(incremental=True) == ["/index.html"]
+    with open(os.path.join(build, "index.html")) as f:
+        assert f.read() == '<link href="/css/site.css"><script src="app.js"></script>'
+    assert os.path.exists(os.path.join(build, "css", "site.css"))
+    assert n.build(incremental=True, fingerprint=True) == ["/index.html"]
+
+
+def test_minify_build(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    with open(os.path.join(project_dir, "static", "site.css"), "w") as f:
+        f.write("body {\n  color: red;\n}\n")
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write("<html>\n  <body>\n    <p>  {{ body }}  </p>\n    <pre>  a\n  b</pre>\n  </body>\n</html>")
+
+    @n.route("/")
+    def index(page):
+        page.data["body"] = "Hello"
+
+    n.build(minify=True)
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert f.read() == "<html><body><p>Hello</p><pre>  a\n  b</pre></body></html>"
+    with open(os.path.join(project_dir, "build", "site.css")) as f:
+        assert f.read() == "body{color:red}"
+    assert n.minifier.saved > 0
+
+    assert n.build(incremental=True) == ["/index.html"]
+    with open(os.path.join(project_dir, "build", "site.css")) as f:
+        assert f.read() == "body {\n  color: red;\n}\n"
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert "<p>  Hello  </p>" in f.read()
+    assert n.build(incremental=True, minify=True) == ["/index.html"]
+    assert n.build(incremental=True, minify=True) == []
+
+
+def test_sharded_build(project_dir):
+    from noise import Noise
+    from noise.shard import merge
+    n = Noise(project_dir)
+    n.init()
+
+    with open(os.path.join(project_dir, "static", "robots.txt"), "w") as f:
+        f.write("User-agent: *")
+    for i in range(12):
+        n.route("/page{}".format(i))(_parallel_page)
+
+    built = []
+    for index in range(3):
+        built += n.build(shard=(index, 3))
+        assert str(n.path.build) == os.path.join(project_dir, "build")
+    assert sorted(built) == sorted(n.routes)
+    assert os.path.exists(os.path.join(project_dir, "shards", "1", "robots.txt"))
+    assert not os.path.exists(os.path.join(project_dir, "shards", "2", "robots.txt"))
+    assert n.build(incremental=True, shard=(1, 3)) == []
+
+    files = merge(n)
+    assert sorted(files) == sorted(list(n.routes) + ["/robots.txt"])
+    with open(os.path.join(project_dir, "build", "page7.html")) as f:
+        assert "<title>/page7.html</title>" in f.read()
+    assert n.build(incremental=True) == []
+
+
+def test_render_cache(project_dir):
+    from noise import Noise
+    cache = os.path.join(project_dir, "render-cache")
+
+    def make():
+        n = Noise(project_dir)
+        n.init()
+
+        @n.route("/")
+        def index(page):
+            page.data["post"] = post
+
+        for i in range(3):
+            n.route("/page{}".format(i))(_parallel_page)
+        return n
+
+    post = os.path.join(project_dir, "post.md")
+    with open(post, "w") as f:
+        f.write("# Post")
+    n = make()
+    with open(os.path.join(project_dir, "template", "index.html"), "w") as f:
+        f.write("{{ post|markdown }}")
+    n.build(render_cache=cache)
+    assert (n.render_cache.hits, n.render_cache.misses) == (0, 4)
+
+    shutil.rmtree(os.path.join(project_dir, "build"))
+    shutil.rmtree(os.path.join(project_dir, ".noise-cache"))
+    n = make()
+    assert len(n.build(render_cache=cache, jobs=2)) == 4
+    assert (n.render_cache.hits, n.render_cache.misses) == (4, 0)
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert "<h1" in f.read()
+
+    with open(post, "w") as f:
+        f.write("# Changed")
+    n.build(render_cache=cache)
+    assert (n.render_cache.hits, n.render_cache.misses) == (3, 1)
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert "Changed" in f.read()
+
+
+def test_render_cache_recompresses_cached_pages(project_dir):
+    import gzip
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+    cache = os.path.join(project_dir, "render-cache")
+    body = {}
+
+    @n.route("/")
+    def index(page):
+        page.data["body"] = body["text"]
+
+    index_path = os.path.join(project_dir, "build", "index.html")
+    for text in ("A" * 2000, "B" * 2000, "A" * 2000):
+        body["text"] = text
+        n.build(compress=True, render_cache=cache)
+        with open(index_path, "rb") as f, gzip.open(index_path + ".gz") as g:
+            assert f.read() == g.read()
+    assert n.render_cache.hits == 1
+
+
+async def _async_item_page(page, slug):
+    await asyncio.sleep(0)
+    page.data["title"] = slug
+    page.data["body"] = "Item"
+
+
+def test_async_callbacks(project_dir):
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    @n.route("/")
+    def index(page):
+        page.data["title"] = "Home"
+
+    slugs = ["a", "b", "c"]
+    n.route("/items/<slug>/", params=lambda: ({"slug": slug} for slug in slugs))(_async_item_page)
+
+    built = n.build(concurrency=2)
+    assert sorted(built) == ["/index.html", "/items/a/index.html", "/items/b/index.html",
+                             "/items/c/index.html"]
+    with open(os.path.join(project_dir, "build", "items", "b", "index.html")) as f:
+        assert "<title>b</title>" in f.read()
+    assert n.build(incremental=True) == []
+
+    page, deps = n.render("/items/c/index.html")
+    assert page.data["title"] == "c"
+
+    slugs.append("d")
+    assert n.build(incremental=True, jobs=2) == ["/items/d/index.html"]
+
+
+WARM_PROJECT = """from noise import Noise
+from helper import TITLE
+
+app = Noise(__file__)
+posts = app.collection("posts/*.md")
+
+@app.route("/")
+def index(page):
+    page.data["title"] = TITLE
+    page.data["body"] = "{} posts".format(len(posts))
+"""
+
+
+def test_warm_reload(project_dir):
+    from noise import Noise, load_project
+    Noise(project_dir).init()
+    os.makedirs(os.path.join(project_dir, "posts"))
+    with open(os.path.join(project_dir, "posts", "a.md"), "w") as f:
+        f.write("---\ntitle: A\n---\n")
+    init_file = os.path.join(project_dir, "__init__.py")
+    helper = os.path.join(project_dir, "helper.py")
+    with open(init_file, "w") as f:
+        f.write(WARM_PROJECT)
+    with open(helper, "w") as f:
+        f.write("TITLE = 'One'\n")
+
+    try:
+        app = load_project(project_dir).app
+        app.build()
+        template, collection = app.template, app.collection("posts/*.md")
+        entries = collection.entries
+
+        with open(init_file, "w") as f:
+            f.write(WARM_PROJECT + '\n@app.route("/about")\ndef about(page):\n    pass\n')
+        with open(helper, "w") as f:
+            f.write("TITLE = 'Second'\n")
+        module = load_project(project_dir, app, [init_file, helper])
+
+        assert module.app is app
+        assert sorted(app.routes) == ["/about.html", "/index.html"]
+        assert app.template is template
+        assert app.collection("posts/*.md").entries is entries
+        assert sys.path.count(project_dir) == 1
+        app.build(incremental=True)
+        with open(os.path.join(project_dir, "build", "index.html")) as f:
+            assert "<title>Second</title>" in f.read()
+
+        with open(os.path.join(project_dir, "posts", "b.md"), "w") as f:
+            f.write("---\ntitle: B\n---\n")
+        assert app.update([os.path.join(project_dir, "posts", "b.md")]) == ["/index.html"]
+        with open(os.path.join(project_dir, "build", "index.html")) as f:
+            assert "2 posts" in f.read()
+    finally:
+        while project_dir in sys.path:
+            sys.path.remove(project_dir)
+        sys.modules.pop("helper", None)
+        sys.modules.pop("noise_project", None)
+
+
+def test_update_falls_back_to_incremental_build(project_dir):
+    import json
+    from noise import Noise
+    n = Noise(project_dir)
+    n.init()
+
+    data = os.path.join(project_dir, "data.json")
+    with open(data, "w") as f:
+        json.dump({"title": "One"}, f)
+
+    @n.route("/")
+    def index(page):
+        with open(data) as f:
+            page.data.update(json.load(f))
+
+    @n.route("/about")
+    def about(page):
+        page.data["title"] = "About"
+
+    n.build()
+    with open(data, "w") as f:
+        json.dump({"title": "Two"}, f)
+    assert n.update([data]) == ["/index.html"]
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert "<title>Two</title>" in f.read()
+
+    with open(data, "w") as f:
+        json.dump({"title": "Three"}, f)
+    assert n.update([project_dir]) == ["/index.html"]
+    with open(os.path.join(project_dir, "build", "index.html")) as f:
+        assert "<title>Three</title>" in f.read()
+
+    css = os.path.join(project_dir, "static", "css")
+    os.makedirs(css)
+    with open(os.path.join(css, "site.css"), "w") as f:
+        f.write("body {}")
+    n.build()
+    shutil.rmtree(css)
+    n.update([css])
+    assert not os.path.exists(os.path.join(project_dir, "build", "css"))
+
+
+def test_reload_invalidates_templates_in_same_batch(project_dir):
+    from noise import Noise, load_project, reload_project
+    from noise.server import PageCache
+    Noise(project_dir).init()
+    init_file = os.path.join(project_dir, "__init__.py")
+    project = ('from noise import Noise\napp = Noise(__file__)\n\n'
+               '@app.route("/about")\ndef about(page):\n    page.data["title"] = {!r}\n')
+    with open(init_file, "w") as f:
+        f.write(project.format("About"))
+
+    try:
+        app = load_project(project_dir).app
+        pages = PageCache(app)
+        assert b"<title>About</title>" in pages.get("/about.html")
+
+        template = os.path.join(project_dir, "template", "about.html")
+        with open(template, "w") as f:
+            f.write("<h1>{{ title }}</h1>")
+        with open(init_file, "w") as f:
+            f.write(project.format("About us"))
+        reload_project(project_dir, app, [template, init_file])
+        pages.reset(app)
+        assert pages.get("/about.html") == b"<h1>About us</h1>"
+    finally:
+        while project_dir in sys.path:
+            sys.path.remove(project_dir)
+        sys.modules.pop("noise_project", None)
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+
+from noise import minify
+from noise.minify import Minifier, css, html
+
+
+DOCUMENT = """<!DOCTYPE html>
+<html>
+  <head>
+    <title> Hello  World </title>
+    <style>
+      body { color: red; margin: 0 }
+    </style>
+  </head>
+  <body>
+    <!-- removed -->
+    <!--[if IE]><p>kept</p><![endif]-->
+    <p>Some   <b>bold</b>  <i>text</i></p>
+    <pre>
+  keep   this
+    </pre>
+    <textarea>  a
+ b</textarea>
+    <script>
+      var x  =  "  a  ";
+    </script>
+  </body>
+</html>
+"""
+
+
+class TestHtml:
+    def test_minifies_document(self):
+        result = html(DOCUMENT)
+        assert result.startswith("<!DOCTYPE html><html><head><title>Hello World</title>")
+        assert "<style>body{color:red;margin:0}</style>" in result
+        assert "removed" not in result
+        assert "<!--[if IE]><p>kept</p><![endif]-->" in result
+        assert "<p>Some <b>bold</b> <i>text</i></p>" in result
+        assert result.endswith("</body></html>")
+
+    def test_preserves_raw_blocks(self):
+        result = html(DOCUMENT)
+        assert "<pre>\n  keep   this\n    </pre>" in result
+        assert "<textarea>  a\n b</textarea>" in result
+        assert '<script>\n      var x  =  "  a  ";\n    </script>' in result
+
+    def test_keeps_attributes(self):
+        assert html('<a title="a   b"  href="/">  x  </a>') == '<a title="a   b"  href="/"> x </a>'
+
+    def test_stream_matches_document(self):
+        expected = html(DOCUMENT)
+        for size in (1, 2, 5, 13, 64):
+            chunks = [DOCUMENT[i:i + size] for i in range(0, len(DOCUMENT), size)]
+            assert "".join(Minifier().stream(iter(chunks))) == expected
+
+
+class TestCss:
+    def test_minifies(self):
+        assert css("a > b , c {\n  color : red ;\n}\n/* note */") == "a>b,c{color :red}"
+
+    def test_preserves_strings_and_license_comments(self):
+        source = '/*! license */\na::after { content: "x ;  }" }'
+        assert css(source) == '/*! license */ a::after{content:"x ;  }"}'
+
+
+class TestMinifier:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_caches_by_content(self, monkeypatch):
+        calls = []
+        monkeypatch.setitem(minify.MINIFIERS, ".css", lambda text: calls.append(text) or "min")
+        cache = os.path.join(self.tmpdir, "cache")
+        assert Minifier(cache).minify("a { }", ".css") == "min"
+        assert Minifier(cache).minify("a { }", ".css") == "min"
+        assert calls == ["a { }"]
+
+    def test_counts_saved_bytes(self):
+        minifier = Minifier()
+        assert minifier.page("<p>  a  </p>") == ("<p>a</p>", "p", "")
+        minifier.minify("a { color: red; }", ".css")
+        assert minifier.saved == 4 + 5
+
+    def test_static_writes_minified_files(self):
+        root = os.path.join(self.tmpdir, "static")
+        os.makedirs(os.path.join(root, "css"))
+        with open(os.path.join(root, "css", "site.css"), "w") as f:
+            f.write("a { color: red; }")
+        with open(os.path.join(root, "robots.txt"), "w") as f:
+            f.write("User-agent: *")
+        target = os.path.join(self.tmpdir, "build")
+        assert Minifier().static(root, target) == ["/css/site.css"]
+        with open(os.path.join(target, "css", "site.css")) as f:
+            assert f.read() == "a{color:red}"
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+
+from noise import output
+
+
+class TestOutput:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_write_skips_identical_bytes(self):
+        path = os.path.join(self.tmpdir, "a", "index.html")
+        assert output.write(path, "hello")
+        inode = os.stat(path).st_ino
+        assert not output.write(path, "hello")
+        assert os.stat(path).st_ino == inode
+        assert output.write(path, "world")
+        with open(path) as f:
+            assert f.read() == "world"
+
+    def test_write_does_not_modify_hardlinks(self):
+        path = os.path.join(self.tmpdir, "index.html")
+        link = os.path.join(self.tmpdir, "link.html")
+        output.write(path, "old")
+        os.link(path, link)
+        output.write(path, "new")
+        with open(link) as f:
+            assert f.read() == "old"
+
+    def test_stream_writes_chunks_if_changed(self):
+        path = os.path.join(self.tmpdir, "a", "index.html")
+        assert output.stream(path, iter(["hel", "lo"]))
+        inode = os.stat(path).st_ino
+        assert not output.stream(path, iter(["hello"]))
+        assert os.stat(path).st_ino == inode
+        assert output.stream(path, iter(["hello", " world"]))
+        with open(path) as f:
+            assert f.read() == "hello world"
+        assert os.listdir(os.path.dirname(path)) == ["index.html"]
+
+    def test_stream_removes_temporary_file_on_error(self):
+        path = os.path.join(self.tmpdir, "index.html")
+
+        def chunks():
+            yield "partial"
+            raise ValueError
+
+        try:
+            output.stream(path, chunks())
+        except ValueError:
+            pass
+        assert os.listdir(self.tmpdir) == []
+
+    def test_exchange_swaps_directories(self):
+        a, b = os.path.join(self.tmpdir, "a"), os.path.join(self.tmpdir, "b")
+        output.write(os.path.join(a, "file"), "a")
+        output.write(os.path.join(b, "file"), "b")
+        output.exchange(a, b)
+        with open(os.path.join(b, "file")) as f:
+            assert f.read() == "a"
+        with open(os.path.join(a, "file")) as f:
+            assert f.read() == "b"
+
+    def test_prune_removes_unlisted_files(self):
+        output.write(os.path.join(self.tmpdir, "keep.html"), "")
+        output.write(os.path.join(self.tmpdir, "old", "gone.html"), "")
+        assert output.prune(self.tmpdir, {"/keep.html"}) == ["/old/gone.html"]
+        assert not os.path.exists(os.path.join(self.tmpdir, "old"))
@@ -9,6 +9,8 @@ from noise.route import format_route
 class FakeApp:
     def __init__(self):
         self.template = FakeTemplate()
+        self.assets = None
+        self.minifier = None
 
     class Path:
         def __init__(self, base):
@@ -34,9 +36,16 @@ class PathHelper:
 
 
 class FakeTemplate:
+    def exists(self, name):
+        return False
+
     def render(self, template, **data):
         return "rendered: {} | {}".format(template, data)
 
+    def generate(self, template, **data):
+        yield "rendered: "
+        yield "{} | {}".format(template, data)
+
 
 class TestPage:
     def setup_method(self):
@@ -65,6 +74,32 @@ class TestPage:
         with open(page.path) as f:
             content = f.read()
         assert "rendered:" in content
+        assert page.rendered is True
+
+    def test_render_reports_changes(self):
+        app = self._make_app()
+        assert Page(app, "/bar").render() is True
+        assert Page(app, "/bar").render() is False
+        assert Page(app, "/bar", keep=True).render() is False
+
+    def test_render_keeps_content_on_request(self):
+        app = self._make_app()
+        page = Page(app, "/bar", keep=True)
+        page.render()
+        with open(page.path) as f:
+            assert f.read() == page.rendered
+
+    def test_render_without_write_returns_content(self):
+        app = self._make_app()
+        page = Page(app, "/bar")
+        page.render(write=False)
+        assert page.rendered.startswith("rendered:")
+        assert not os.path.exists(page.path)
+
+    def test_page_uses_slots(self):
+        app = self._make_app()
+        page = Page(app, "/bar")
+        assert not hasattr(page, "__dict__")
 
     def _make_app(self):
         app = FakeApp()
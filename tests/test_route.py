@@ -1,4 +1,4 @@
-from noise.route import format_route, Route, BOILERPLATE
+from noise.route import format_route, Parameterized, Route, BOILERPLATE
 
 
 class TestFormatRoute:
@@ -39,6 +39,43 @@ class TestRoute:
         result = route("/foo")(handler)
         assert result is handler
 
+    def test_registers_parameterized_route(self):
+        app = FakeApp()
+        route = Route(app)
+
+        @route("/items/<slug>/", params=[{"slug": "a"}])
+        def handler(page, slug):
+            pass
+
+        entry = app.routes["/items/<slug>/index.html"]
+        assert isinstance(entry, Parameterized)
+        assert entry.callback is handler
+
+
+class TestParameterized:
+    def test_expands_lazily(self):
+        pulled = []
+
+        def params():
+            for i in range(3):
+                pulled.append(i)
+                yield {"slug": "item{}".format(i)}
+
+        route = Parameterized(format_route("/items/<slug>/"), lambda page, slug: slug, params)
+        pages = iter(route)
+        name, callback = next(pages)
+        assert name == "/items/item0/index.html"
+        assert callback(None) == "item0"
+        assert pulled == [0]
+        assert [name for name, _ in pages] == ["/items/item1/index.html", "/items/item2/index.html"]
+        assert len(list(route)) == 3
+
+    def test_match(self):
+        route = Parameterized(format_route("/<year>/<slug>"), None, [])
+        assert route.match("/2024/post.html")
+        assert not route.match("/2024/a/post.html")
+        assert not route.match("/2024/post.xml")
+
 
 class TestBoilerplate:
     def test_is_string(self):
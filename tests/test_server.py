@@ -0,0 +1,236 @@
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from noise.server import DevServer, PageCache, parse_range
+
+
+class TestAffects:
+    def test_matches_viewed_page(self):
+        assert DevServer.affects(["/about.html"], "/about.html")
+        assert DevServer.affects(["/index.html"], "/")
+        assert DevServer.affects(["/blog/index.html"], "/blog/")
+        assert DevServer.affects(["/about.html"], "/about")
+
+    def test_ignores_other_pages(self):
+        assert not DevServer.affects(["/about.html"], "/")
+
+    def test_assets_reload_everything(self):
+        assert DevServer.affects(["/css/site.css"], "/")
+
+    def test_unknown_changes_reload_everything(self):
+        assert DevServer.affects(None, "/")
+        assert DevServer.affects(["/about.html"], None)
+
+
+class TestPageCache:
+    def setup_method(self):
+        import tempfile
+        from noise import Noise
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = Noise(self.tmpdir)
+        self.app.path.init()
+        self.template = os.path.join(self.tmpdir, "template", "index.html")
+        with open(self.template, "w") as f:
+            f.write("{{ title }}")
+        self.calls = []
+
+        @self.app.route("/")
+        def index(page):
+            self.calls.append(page.route)
+            page.data["title"] = "Home"
+
+        @self.app.route("/about")
+        def about(page):
+            self.calls.append(page.route)
+
+    def teardown_method(self):
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_renders_on_first_request(self):
+        pages = PageCache(self.app)
+        assert pages.get("/index.html") == b"Home"
+        assert pages.get("/index.html") == b"Home"
+        assert self.calls == ["/index.html"]
+        assert not os.path.exists(os.path.join(self.tmpdir, "build", "index.html"))
+
+    def test_unknown_route(self):
+        assert PageCache(self.app).get("/missing.html") is None
+
+    def test_invalidates_dependents(self):
+        pages = PageCache(self.app)
+        pages.get("/index.html")
+        pages.get("/about.html")
+        with open(self.template, "w") as f:
+            f.write("<h1>{{ title }}</h1>")
+        assert pages.invalidate([self.template]) == ["/index.html"]
+        assert pages.get("/index.html") == b"<h1>Home</h1>"
+
+    def test_collection_changes_clear_pages(self):
+        posts = self.app.collection("posts/*.md")
+        os.makedirs(os.path.join(self.tmpdir, "posts"))
+
+        @self.app.route("/count")
+        def count(page):
+            page.template = self.template
+            page.data["title"] = str(len(posts))
+
+        pages = PageCache(self.app)
+        assert pages.get("/count.html") == b"0"
+        post = os.path.join(self.tmpdir, "posts", "a.md")
+        with open(post, "w") as f:
+            f.write("---\ntitle: A\n---\n")
+        assert pages.invalidate([post]) is None
+        assert pages.get("/count.html") == b"1"
+
+    def test_evicts_least_recently_used(self):
+        pages = PageCache(self.app, size=1)
+        pages.get("/index.html")
+        pages.get("/about.html")
+        pages.get("/index.html")
+        assert self.calls == ["/index.html", "/about.html", "/index.html"]
+
+
+class TestDevServer:
+    def setup_method(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmpdir, "index.html"), "w") as f:
+            f.write("<html><body>Home</body></html>")
+        self.server = DevServer(self.tmpdir, self.tmpdir, lambda changed: None, workers=8)
+        self.httpd = self.server.bind("127.0.0.1", 0)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def teardown_method(self):
+        import shutil
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _subscribe(self, path="/"):
+        sock = socket.create_connection(("127.0.0.1", self.port), timeout=5)
+        sock.sendall("GET /__noise_reload?path={} HTTP/1.1\r\nHost: x\r\n\r\n".format(path).encode())
+        head = b""
+        while b"\r\n\r\n" not in head:
+            head += sock.recv(1024)
+        assert b"text/event-stream" in head
+        return sock
+
+    def test_latency_with_open_tabs(self):
+        import http.client
+        tabs = [self._subscribe() for _ in range(50)]
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+            latencies = []
+            for _ in range(20):
+                start = time.perf_counter()
+                conn.request("GET", "/index.html")
+                response = conn.getresponse()
+                body = response.read()
+                latencies.append(time.perf_counter() - start)
+                assert response.status == 200
+                assert b"__noise_reload" in body
+            conn.close()
+            assert max(latencies) < 1
+        finally:
+            for sock in tabs:
+                sock.close()
+
+    def test_broadcast_reaches_affected_tabs(self):
+        index, about = self._subscribe("/"), self._subscribe("/about")
+        time.sleep(0.1)
+        self.server.broadcast(["/index.html"])
+        assert index.recv(1024) == b"data: reload\n\n"
+        about.settimeout(0.2)
+        with pytest.raises(socket.timeout):
+            about.recv(1024)
+        self.server.broadcast()
+        assert about.recv(1024) == b"data: reload\n\n"
+
+    def test_drops_closed_listeners(self):
+        live = self._subscribe("/")
+        for _ in range(20):
+            self._subscribe("/about").close()
+        time.sleep(0.1)
+        self.server.broadcast(["/other.html"])
+        assert [path for _, path in self.server._listeners] == ["/"]
+        self.server.broadcast()
+        assert live.recv(1024) == b"data: reload\n\n"
+
+    def _get(self, path, **headers):
+        import http.client
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def test_html_etag_not_modified(self):
+        response, body = self._get("/")
+        assert response.status == 200
+        assert b"__noise_reload" in body
+        etag = response.getheader("ETag")
+        response, body = self._get("/index.html", **{"If-None-Match": etag})
+        assert response.status == 304
+        assert body == b""
+        modified = response.getheader("Last-Modified")
+        response, _ = self._get("/index.html", **{"If-Modified-Since": modified})
+        assert response.status == 304
+
+    def test_injection_is_cached(self):
+        path = os.path.join(self.tmpdir, "index.html")
+        st = os.stat(path)
+        assert self.server.html(path, st) is self.server.html(path, st)
+
+    def test_range_requests(self):
+        with open(os.path.join(self.tmpdir, "data.bin"), "wb") as f:
+            f.write(bytes(range(256)))
+        response, body = self._get("/data.bin")
+        assert response.status == 200
+        assert body == bytes(range(256))
+        response, body = self._get("/data.bin", Range="bytes=10-19")
+        assert response.status == 206
+        assert response.getheader("Content-Range") == "bytes 10-19/256"
+        assert body == bytes(range(10, 20))
+        response, body = self._get("/data.bin", Range="bytes=-6")
+        assert body == bytes(range(250, 256))
+        response, _ = self._get("/data.bin", Range="bytes=300-")
+        assert response.status == 416
+
+    def test_serves_precompressed_variant(self):
+        import gzip
+        data = b"body { color: red; }\n" * 200
+        path = os.path.join(self.tmpdir, "site.css")
+        with open(path, "wb") as f:
+            f.write(data)
+        from noise.compress import compress
+        compress(path)
+        response, body = self._get("/site.css", **{"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert response.getheader("Vary") == "Accept-Encoding"
+        assert gzip.decompress(body) == data
+        response, body = self._get("/site.css")
+        assert response.getheader("Content-Encoding") is None
+        assert body == data
+
+
+class TestParseRange:
+    def test_parses_ranges(self):
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=90-200", 100) == (90, 99)
+
+    def test_unsatisfiable(self):
+        assert parse_range("bytes=100-", 100) is False
+        assert parse_range("bytes=5-1", 100) is False
+
+    def test_ignores_unsupported(self):
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("items=0-1", 100) is None
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from noise import Noise
+from noise.shard import MANIFEST, merge, parse, shard_of, write
+
+
+class TestPartition:
+    def test_parse(self):
+        assert parse("1/4") == (0, 4)
+        assert parse("4/4") == (3, 4)
+        for value in ("0/4", "5/4", "a/b", "2"):
+            with pytest.raises(ValueError):
+                parse(value)
+
+    def test_shard_of_is_stable_and_balanced(self):
+        routes = ["/page{}.html".format(i) for i in range(1000)]
+        shards = [shard_of(route, 4) for route in routes]
+        assert shards == [shard_of(route, 4) for route in routes]
+        assert all(150 < shards.count(i) < 350 for i in range(4))
+
+
+class TestMerge:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = Noise(self.tmpdir)
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def shard(self, index, count, files, entries=None):
+        target = os.path.join(self.tmpdir, "shards", str(index + 1))
+        for route, content in files.items():
+            path = os.path.join(target, route.lstrip("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        os.makedirs(target, exist_ok=True)
+        write(target, index, count, entries or {})
+        return target
+
+    def test_write_lists_files(self):
+        target = self.shard(0, 2, {"/a.html": "a", "/css/site.css": "css"})
+        with open(os.path.join(target, MANIFEST)) as f:
+            assert json.load(f)["files"] == ["/a.html", "/css/site.css"]
+
+    def test_merges_outputs_and_manifests(self):
+        self.shard(0, 2, {"/a.html": "a"}, {"/a.html": {"deps": {}}})
+        self.shard(1, 2, {"/b/index.html": "b"}, {"/b/index.html": {"deps": {}}})
+        old = os.path.join(self.tmpdir, "build", "old.html")
+        os.makedirs(os.path.dirname(old))
+        with open(old, "w") as f:
+            f.write("old")
+
+        assert merge(self.app) == ["/a.html", "/b/index.html"]
+        with open(os.path.join(self.tmpdir, "build", "b", "index.html")) as f:
+            assert f.read() == "b"
+        assert not os.path.exists(old)
+        with open(os.path.join(self.tmpdir, ".noise-cache", "manifest.json")) as f:
+            assert sorted(json.load(f)) == ["/a.html", "/b/index.html"]
+
+    def test_detects_collisions(self):
+        self.shard(0, 2, {"/a.html": "a"})
+        self.shard(1, 2, {"/a.html": "b"})
+        with pytest.raises(ValueError, match="collide"):
+            merge(self.app)
+
+    def test_detects_missing_shards(self):
+        self.shard(0, 3, {"/a.html": "a"})
+        self.shard(2, 3, {"/c.html": "c"})
+        with pytest.raises(ValueError, match="incomplete"):
+            merge(self.app)
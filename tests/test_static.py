@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+
+from noise.static import sync
+
+
+class TestSync:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmpdir, "static")
+        self.dst = os.path.join(self.tmpdir, "build")
+        os.makedirs(os.path.join(self.src, "css"))
+        self._write("css/site.css", "body {}")
+        self._write("robots.txt", "User-agent: *")
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _write(self, name, data):
+        with open(os.path.join(self.src, name), "w") as f:
+            f.write(data)
+
+    def test_copies_tree(self):
+        report = sync(self.src, self.dst)
+        assert sorted(report["files"]) == ["/css/site.css", "/robots.txt"]
+        assert report["copied"] + report["linked"] == 2
+        with open(os.path.join(self.dst, "css", "site.css")) as f:
+            assert f.read() == "body {}"
+        src, dst = os.stat(os.path.join(self.src, "robots.txt")), os.stat(os.path.join(self.dst, "robots.txt"))
+        assert src.st_mtime_ns == dst.st_mtime_ns
+
+    def test_skips_unchanged(self):
+        sync(self.src, self.dst)
+        inode = os.stat(os.path.join(self.dst, "robots.txt")).st_ino
+        self._write("css/site.css", "main {}")
+        report = sync(self.src, self.dst)
+        assert report["skipped"] == 1
+        assert report["copied"] + report["linked"] == 1
+        assert os.stat(os.path.join(self.dst, "robots.txt")).st_ino == inode
+        with open(os.path.join(self.dst, "css", "site.css")) as f:
+            assert f.read() == "main {}"
+
+    def test_checksum_ignores_mtime(self):
+        sync(self.src, self.dst)
+        os.utime(os.path.join(self.src, "robots.txt"), (0, 0))
+        assert sync(self.src, self.dst, checksum=True)["skipped"] == 2
+
+    def test_hardlink(self):
+        report = sync(self.src, self.dst, hardlink=True)
+        assert report["linked"] == 2
+        assert report["bytes"] == 0
+        assert os.path.samefile(os.path.join(self.src, "robots.txt"), os.path.join(self.dst, "robots.txt"))
@@ -51,6 +51,15 @@ class TestTemplate:
         assert "<title>Test</title>" in result
         assert "Content" in result
 
+    def test_generate_yields_buffered_chunks(self):
+        from noise.template import CHUNK_SIZE
+        app = FakeApp()
+        tpl = Template(app)
+        source = "{% for i in range(n) %}{{ line }}{% endfor %}"
+        chunks = list(tpl.generate(source, n=1000, line="x" * 200))
+        assert "".join(chunks) == "x" * 200000
+        assert 1 < len(chunks) <= 200000 // CHUNK_SIZE + 1
+
     def test_markdown_filter_available(self):
         app = FakeApp()
         tpl = Template(app)
@@ -61,3 +70,178 @@ class FakeApp:
     class Path:
         template = "/tmp/nonexistent-template-dir"
     path = Path()
+
+    def asset(self, name):
+        return "/" + name
+
+
+class TestDependencies:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_follows_extends_and_include(self):
+        for name, source in (
+            ("base.html", "{% include 'nav.html' %}{% block body %}{% endblock %}"),
+            ("nav.html", "<nav></nav>"),
+            ("page.html", "{% extends 'base.html' %}"),
+        ):
+            with open(os.path.join(self.tmpdir, name), "w") as f:
+                f.write(source)
+        app = FakeApp()
+        app.path = FakeApp.Path()
+        app.path.template = self.tmpdir
+        tpl = Template(app)
+        deps = tpl.dependencies("page.html")
+        assert deps == {os.path.join(self.tmpdir, n) for n in ("base.html", "nav.html", "page.html")}
+
+    def test_invalidate_drops_affected_templates(self):
+        for name, source in (
+            ("page.html", "{% include 'nav.html' %}"),
+            ("nav.html", "<nav></nav>"),
+            ("other.html", "other"),
+        ):
+            with open(os.path.join(self.tmpdir, name), "w") as f:
+                f.write(source)
+        app = FakeApp()
+        app.path = FakeApp.Path()
+        app.path.template = self.tmpdir
+        tpl = Template(app)
+        tpl.dependencies("page.html")
+        tpl.dependencies("other.html")
+        assert tpl.exists("nav.html")
+        names = tpl._names
+
+        tpl.invalidate([os.path.join(self.tmpdir, "nav.html")])
+        assert sorted(tpl._dependencies) == ["other.html"]
+        assert tpl._names is names
+
+        with open(os.path.join(self.tmpdir, "new.html"), "w") as f:
+            f.write("new")
+        tpl.invalidate([os.path.join(self.tmpdir, "new.html")])
+        assert tpl.exists("new.html")
+
+    def test_string_template_has_no_file(self):
+        tpl = Template(FakeApp())
+        assert tpl.dependencies(BOILERPLATE) == set()
+
+    def test_markdown_filter_records_files(self):
+        from noise.template import track_dependencies
+        path = os.path.join(self.tmpdir, "post.md")
+        with open(path, "w") as f:
+            f.write("# Post")
+        with track_dependencies() as deps:
+            markdown_filter(path)
+        assert deps == {path}
+
+
+class TestMarkdownCache:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_counts_hits_and_misses(self):
+        from noise.template import MarkdownCache
+        cache = MarkdownCache()
+        first = cache.convert("# Hello")
+        second = cache.convert("# Hello")
+        assert first == second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self):
+        from noise.template import MarkdownCache
+        cache = MarkdownCache(size=2)
+        for text in ("a", "b", "a", "c"):
+            cache.convert(text)
+        assert cache.get(cache.key("a")) is not None
+        assert cache.get(cache.key("b")) is None
+
+    def test_disk_cache_survives_instances(self):
+        from noise.template import MarkdownCache
+        MarkdownCache(self.tmpdir).convert("*cached*")
+        cache = MarkdownCache(self.tmpdir)
+        assert cache.convert("*cached*") == "<p><em>cached</em></p>"
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_trim_evicts_least_recently_used_files(self):
+        from noise.template import MarkdownCache
+        cache = MarkdownCache(self.tmpdir, disk_size=60)
+        for i, text in enumerate(("a" * 20, "b" * 20, "c" * 20)):
+            cache.convert(text)
+            path = cache._file(cache.key(text))
+            os.utime(path, (i, i))
+        MarkdownCache(self.tmpdir).get(cache.key("a" * 20))
+        assert cache.trim() == 1
+        assert MarkdownCache(self.tmpdir).get(cache.key("a" * 20)) is not None
+        assert MarkdownCache(self.tmpdir).get(cache.key("b" * 20)) is None
+
+    def test_file_change_invalidates(self):
+        from noise.template import MarkdownCache
+        path = os.path.join(self.tmpdir, "post.md")
+        with open(path, "w") as f:
+            f.write("one")
+        cache = MarkdownCache()
+        assert cache.convert(path) == "<p>one</p>"
+        with open(path, "w") as f:
+            f.write("two!")
+        assert cache.convert(path) == "<p>two!</p>"
+
+
+class TestBytecodeCache:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.template_dir = os.path.join(self.tmpdir, "template")
+        os.makedirs(os.path.join(self.template_dir, "partials"))
+        with open(os.path.join(self.template_dir, "index.html"), "w") as f:
+            f.write("{% include 'partials/nav.html' %}{{ title }}")
+        with open(os.path.join(self.template_dir, "partials", "nav.html"), "w") as f:
+            f.write("<nav></nav>")
+
+    def teardown_method(self):
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _template(self):
+        app = FakeApp()
+        app.path = FakeApp.Path()
+        app.path.template = self.template_dir
+        return Template(app, os.path.join(self.tmpdir, "cache"))
+
+    def test_compile_writes_bytecode(self):
+        names = self._template().compile()
+        assert sorted(names) == ["index.html", "partials/nav.html"]
+        assert len(os.listdir(os.path.join(self.tmpdir, "cache", "jinja"))) == 2
+
+    def test_renders_from_bytecode(self):
+        self._template().compile()
+        assert self._template().render("index.html", title="Hi") == "<nav></nav>Hi"
+
+
+class TestCompiledCache:
+    def test_reuses_compiled_string_templates(self):
+        tpl = Template(FakeApp())
+        assert tpl.from_string(BOILERPLATE) is tpl.from_string(BOILERPLATE)
+
+    def test_index_is_rebuilt_on_reset(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            app = FakeApp()
+            app.path = FakeApp.Path()
+            app.path.template = tmpdir
+            tpl = Template(app)
+            assert not tpl.exists("index.html")
+            with open(os.path.join(tmpdir, "index.html"), "w") as f:
+                f.write("{{ title }}")
+            assert not tpl.exists("index.html")
+            tpl.reset()
+            assert tpl.exists("index.html")
+            assert tpl.render("index.html", title="Hi") == "Hi"
+        finally:
+            import shutil
+            shutil.rmtree(tmpdir, ignore_errors=True)
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+from noise.watch import InotifyWatcher, PollingWatcher, watcher
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self.event = threading.Event()
+
+    def __call__(self, changed):
+        self.calls.append(changed)
+        self.event.set()
+
+
+class TestWatcher:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmpdir, "template"))
+        os.makedirs(os.path.join(self.tmpdir, "build"))
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _write(self, *parts):
+        path = os.path.join(self.tmpdir, *parts)
+        with open(path, "w") as f:
+            f.write("x")
+        return path
+
+    def test_polling_reports_changed_paths(self):
+        recorder = Recorder()
+        w = PollingWatcher(self.tmpdir, recorder, delay=0.05)
+        w.start()
+        path = self._write("template", "index.html")
+        self._write("build", "index.html")
+        assert recorder.event.wait(5)
+        assert recorder.calls[0] == [path]
+
+    def test_inotify_debounces_bursts(self):
+        recorder = Recorder()
+        try:
+            w = InotifyWatcher(self.tmpdir, recorder, delay=0.2)
+        except (OSError, AttributeError, TypeError):
+            pytest.skip("inotify unavailable")
+        w.start()
+        paths = [self._write("template", "{}.html".format(i)) for i in range(5)]
+        self._write("build", "index.html")
+        assert recorder.event.wait(5)
+        assert recorder.calls == [sorted(paths)]
+
+    def test_inotify_watches_new_directories(self):
+        recorder = Recorder()
+        try:
+            w = InotifyWatcher(self.tmpdir, recorder, delay=0.2)
+        except (OSError, AttributeError, TypeError):
+            pytest.skip("inotify unavailable")
+        w.start()
+        os.makedirs(os.path.join(self.tmpdir, "static", "css"))
+        path = self._write("static", "css", "site.css")
+        assert recorder.event.wait(5)
+        assert path in recorder.calls[0]
+
+    def test_inotify_reports_moved_out_directories(self):
+        recorder = Recorder()
+        os.makedirs(os.path.join(self.tmpdir, "posts"))
+        self._write("posts", "a.md")
+        try:
+            w = InotifyWatcher(self.tmpdir, recorder, delay=0.2)
+        except (OSError, AttributeError, TypeError):
+            pytest.skip("inotify unavailable")
+        w.start()
+        elsewhere = tempfile.mkdtemp()
+        try:
+            posts = os.path.join(self.tmpdir, "posts")
+            os.rename(posts, os.path.join(elsewhere, "posts"))
+            assert recorder.event.wait(5)
+            assert recorder.calls[0] == [posts]
+            assert posts not in w.watches.values()
+        finally:
+            shutil.rmtree(elsewhere, ignore_errors=True)
+
+    def test_custom_ignore_list(self):
+        recorder = Recorder()
+        w = watcher(self.tmpdir, recorder, ignore=("template",))
+        w.start()
+        self._write("template", "index.html")
+        path = self._write("build", "index.html")
+        assert recorder.event.wait(5)
+        assert recorder.calls[0] == [path]
+
+    def test_imports_without_o_nonblock(self, monkeypatch):
+        import importlib
+        import noise.watch
+        monkeypatch.delattr(os, "O_NONBLOCK")
+        try:
+            assert importlib.reload(noise.watch).IN_NONBLOCK == 0o4000
+        finally:
+            monkeypatch.undo()
+            importlib.reload(noise.watch)